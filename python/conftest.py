@@ -0,0 +1,2 @@
+# pytest puts the folder of this file on the path, so the tests can import
+# the package no matter where pytest is started from.
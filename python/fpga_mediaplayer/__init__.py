@@ -0,0 +1,36 @@
+# The tools of the project as a package, the scripts next to it are just their entry points.
+# Submodules are only imported once one of their functions is used so the scripts start quickly.
+import importlib
+
+_EXPORTS = {
+    "MediaFile": "codec",
+    "MediaDirectory": "codec",
+    "open_mediafile": "codec",
+    "DecoderStatistics": "codec",
+    "audio_encoder": "codec",
+    "audio_encoder_chunks": "codec",
+    "audio_decoder": "codec",
+    "video_encoder": "codec",
+    "video_encoder_chunks": "codec",
+    "intra_video_encoder": "codec",
+    "intra_video_encoder_chunks": "codec",
+    "video_decoder": "codec",
+    "convert_file": "convert",
+    "convert_tiles": "tiles",
+    "decode_file": "player",
+    "play_file": "player",
+    "build_image": "concat",
+    "diff_images": "flashdiff",
+    "scan_file": "scan",
+    "collect_statistics": "stats",
+    "Client": "client",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+    return getattr(importlib.import_module("." + _EXPORTS[name], __name__), name)
@@ -0,0 +1,156 @@
+import argparse
+import sys
+import os
+import json
+import time
+import urllib.request
+import urllib.error
+
+from typing import List
+
+
+# Talks to the conversion service of server.py.
+class Client:
+    url: str
+
+    def __init__(self, url: str = "http://127.0.0.1:8765"):
+        self.url = url.rstrip("/")
+
+    def request(self, method: str, path: str, data: dict = None):
+        body = json.dumps(data).encode() if data is not None else None
+
+        http_request = urllib.request.Request(self.url + path, data=body, method=method)
+        http_request.add_header("Content-Type", "application/json")
+
+        try:
+            with urllib.request.urlopen(http_request) as response:
+                content = response.read()
+
+                if response.headers.get("Content-Type") == "application/json":
+                    return json.loads(content)
+
+                return content
+        except urllib.error.HTTPError as error:
+            raise Exception(json.loads(error.read()).get("error", str(error)))
+        except urllib.error.URLError as error:
+            raise Exception("Could not connect to the conversion service: " + str(error.reason))
+
+    def submit(self, input: str, resolution: str = "32:24", priority: int = 0, intra: bool = False, verify: bool = False) -> dict:
+        return self.request("POST", "/jobs", {
+            # The service resolves paths relative to its own working directory.
+            "input": os.path.abspath(input),
+            "resolution": resolution,
+            "priority": priority,
+            "intra": intra,
+            "verify": verify
+        })
+
+    def status(self, id: int) -> dict:
+        return self.request("GET", "/jobs/" + str(id))
+
+    def jobs(self) -> List[dict]:
+        return self.request("GET", "/jobs")
+
+    def cancel(self, id: int) -> dict:
+        return self.request("DELETE", "/jobs/" + str(id))
+
+    # Polls until the job has finished and returns its last status.
+    def wait(self, id: int, interval: float = 0.5) -> dict:
+        job = self.status(id)
+
+        while job["status"] in ["queued", "running"]:
+            time.sleep(interval)
+            job = self.status(id)
+
+        return job
+
+    def result(self, id: int) -> bytes:
+        return self.request("GET", "/jobs/" + str(id) + "/result")
+
+
+def print_status(job: dict):
+    line = ("#" + str(job["id"])).ljust(8) + job["status"].ljust(12)
+
+    if job["status"] == "running":
+        line += (str(int(job["progress"] * 100)) + "% (" + str(job["stage"]) + ")").ljust(20)
+
+    line += job["input"] + (" - " + job["error"] if job["error"] is not None else "")
+
+    # Verified jobs show whether their streams decode to the input.
+    if job["report"] is not None:
+        for stream in ["audio", "video"]:
+            if "verify" in job["report"].get(stream, {}):
+                line += " - " + stream + (" ok" if job["report"][stream]["verify"]["first_mismatch"] is None else " mismatch")
+
+    print(line)
+
+
+def fetch(client: Client, id: int, output: str):
+    job = client.wait(id)
+
+    if job["status"] != "done":
+        print_status(job)
+        return
+
+    with open(output, "wb") as file:
+        file.write(client.result(id))
+
+    print("Written to " + output)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="client",
+        description="Submits media files to the conversion service of server.py\n" +
+                    "and fetches the encoded files.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-u", "--url", type=str, required=False, default="http://127.0.0.1:8765", help="Address of the conversion service\n(default: http://127.0.0.1:8765)")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = commands.add_parser("submit", help="Submit a media file for conversion")
+    submit_parser.add_argument("-i", "--input", type=str, required=True, help="Input media file")
+    submit_parser.add_argument("-r", "--resolution", type=str, required=False, default="32:24", help="Target resolution in w:h.\n(default: 32:24)")
+    submit_parser.add_argument("-p", "--priority", type=int, required=False, default=0, help="Jobs with higher priorities are converted first\n(default: 0)")
+    submit_parser.add_argument("-c", "--intra", action="store_true", required=False, help="Code scene cuts as intra frames without the previous frame.\nThe file can only be played by the python scripts.")
+    submit_parser.add_argument("-v", "--verify", action="store_true", required=False, help="Decode the output and compare it with the input.\nThe result is part of the job status.")
+    submit_parser.add_argument("-o", "--output", type=str, required=False, help="Wait for the job and write the encoded file here")
+
+    status_parser = commands.add_parser("status", help="Show the status of a job or all jobs")
+    status_parser.add_argument("id", type=int, nargs="?", help="Job id")
+
+    cancel_parser = commands.add_parser("cancel", help="Cancel a job")
+    cancel_parser.add_argument("id", type=int, help="Job id")
+
+    fetch_parser = commands.add_parser("fetch", help="Wait for a job and write the encoded file")
+    fetch_parser.add_argument("id", type=int, help="Job id")
+    fetch_parser.add_argument("-o", "--output", type=str, required=True, help="Output encoded file")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(args=argv if argv else ["--help"])
+
+    client = Client(args.url)
+
+    try:
+        if args.command == "submit":
+            job = client.submit(args.input, args.resolution, args.priority, args.intra, args.verify)
+            print_status(job)
+
+            if args.output is not None:
+                fetch(client, job["id"], args.output)
+
+        elif args.command == "status":
+            if args.id is None:
+                for job in client.jobs():
+                    print_status(job)
+            else:
+                print_status(client.status(args.id))
+
+        elif args.command == "cancel":
+            print_status(client.cancel(args.id))
+
+        elif args.command == "fetch":
+            fetch(client, args.id, args.output)
+    except Exception as e:
+        print(str(e))
@@ -0,0 +1,676 @@
+from struct import pack, unpack
+from typing import Iterator, List, Tuple
+
+import os
+import mmap
+
+from array import array
+from collections import deque
+
+# Signature at the start of the header for every version of the format.
+# Version 2 video streams start every frame with its frame mode.
+SIGNATURES = {1: b"A", 2: b"B"}
+
+
+# See the notes about the media encoding for the header structure description
+class MediaFile:
+    A: bytes
+    VERSION: int
+    WIDTH: int
+    HEIGHT: int
+    AUDIO_LENGTH: int
+    VIDEO_LENGTH: int
+    Z: bytes
+    AUDIO: memoryview
+    VIDEO: memoryview
+
+    # The header can be at any offset, e.g. in a flash image. The streams are
+    # views into the passed buffer so nothing gets copied, even for memory maps.
+    def __init__(self, file: bytes, offset: int = 0):
+        unpacked = unpack("<cBBIIc", file[offset:offset+12])
+
+        self.A, self.WIDTH, self.HEIGHT, self.AUDIO_LENGTH, self.VIDEO_LENGTH, self.Z = unpacked
+
+        if not (self.A in SIGNATURES.values() and self.Z == b"Z"):
+            raise Exception("File does not contain header.")
+
+        self.VERSION = [version for version, signature in SIGNATURES.items() if signature == self.A][0]
+
+        view = memoryview(file)
+        audio_start = offset + 12
+        video_start = audio_start + self.AUDIO_LENGTH
+
+        self.AUDIO = view[audio_start:video_start]
+        self.VIDEO = view[video_start:video_start+self.VIDEO_LENGTH]
+
+    @staticmethod
+    def as_bytes(width: int, height: int, audio_length: int, video_length: int, version: int = 1) -> bytes:
+        header = [SIGNATURES[version], width, height, audio_length, video_length, b"Z"]
+        return pack("<cBBIIc", *header)
+
+
+# Opens the media file at offset of a file (e.g. a flash image) without reading it.
+# The file is memory mapped and stays open as long as the streams are referenced.
+def open_mediafile(path: str, offset: int = 0) -> MediaFile:
+    with open(path, "rb") as file:
+        # Empty files can't be mapped.
+        if os.path.getsize(path) == 0:
+            raise Exception("File does not contain header.")
+
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return MediaFile(mapped, offset)
+
+
+# Table of the media files stored in a flash image, see the notes about the flash image layout.
+class MediaDirectory:
+    # Marks the start of the directory so it can be found on the flash.
+    SIGNATURE_BYTES = b"MEDIADIR"
+
+    SIGNATURE: bytes
+    COUNT: int
+    ENTRIES: List[Tuple[int, int]]
+    Z: bytes
+
+    def __init__(self, file: bytes):
+        self.SIGNATURE, self.COUNT = unpack("<8sB", file[0:9])
+
+        if self.SIGNATURE != MediaDirectory.SIGNATURE_BYTES:
+            raise Exception("File does not contain a directory.")
+
+        self.ENTRIES = [
+            unpack("<II", file[9+i*8:9+(i+1)*8]) for i in range(self.COUNT)
+        ]
+
+        self.Z, = unpack("<c", file[9+self.COUNT*8:10+self.COUNT*8])
+
+        if self.Z != b"Z":
+            raise Exception("File does not contain a directory.")
+
+    @staticmethod
+    def as_bytes(entries: List[Tuple[int, int]]) -> bytes:
+        directory = pack("<8sB", MediaDirectory.SIGNATURE_BYTES, len(entries))
+
+        for offset, length in entries:
+            directory += pack("<II", offset, length)
+
+        return directory + pack("<c", b"Z")
+
+
+# Length of the code words in bits by their class:
+# [same, previous + 1, previous - 1, full sample, raw pixel of an intra frame]
+CODEWORD_BITS = [1, 2, 3, 7, 4]
+
+# Frame modes of version 2 video streams and the bits that start the frame:
+# temporal (previous frame), intra (raw 4 bit pixels) or spatial (left or upper pixel).
+FRAME_TEMPORAL = 0
+FRAME_INTRA = 1
+FRAME_SPATIAL = 2
+FRAME_MODE_BITS = [[0], [1, 0], [1, 1]]
+
+
+# Can be passed to the decoders to collect statistics about the decoded code words.
+# Code words are grouped into frames of frame_length code words (a video frame,
+# or a second of audio) and frame_rate frames make up a second.
+class DecoderStatistics:
+    frame_length: int
+    frame_rate: int
+
+    # Per frame: number of bits and number of code words of each class
+    frame_bits: array
+    frame_codewords: List[array]
+
+    # Per position in the frame (pixel): number of full sample code words
+    escapes: array
+
+    def __init__(self, frame_length: int, frame_rate: int):
+        self.frame_length = frame_length
+        self.frame_rate = frame_rate
+
+        self.frame_bits = array("L")
+        self.frame_codewords = [array("L") for _ in CODEWORD_BITS]
+        self.escapes = array("L", [0]) * frame_length
+
+        # Starts a new frame with the first recorded code word.
+        self.position = frame_length
+
+    # Version 2 video streams start the frame with the bits of the frame mode.
+    def start_frame(self, bits: int = 0):
+        self.position = 0
+
+        self.frame_bits.append(bits)
+        for counts in self.frame_codewords:
+            counts.append(0)
+
+    def record(self, codeword: int):
+        if self.position == self.frame_length:
+            self.start_frame()
+
+        self.frame_bits[-1] += CODEWORD_BITS[codeword]
+        self.frame_codewords[codeword][-1] += 1
+
+        if codeword == 3:
+            self.escapes[self.position] += 1
+
+        self.position += 1
+
+    def second_bits(self) -> array:
+        return array("L", [
+            sum(self.frame_bits[i:i+self.frame_rate])
+            for i in range(0, len(self.frame_bits), self.frame_rate)
+        ])
+
+    def second_codewords(self) -> List[array]:
+        return [
+            array("L", [sum(counts[i:i+self.frame_rate]) for i in range(0, len(counts), self.frame_rate)])
+            for counts in self.frame_codewords
+        ]
+
+
+# Reverses the bits of a nibble, the 4 bit values are stored MSB first
+# but the bits are read starting from the LSB of a byte.
+NIBBLE_VALUES = [
+    ((x & 1) << 3) | ((x & 2) << 1) | ((x & 4) >> 1) | ((x & 8) >> 3) for x in range(16)
+]
+
+# Code word class, length and full sample value for the next 7 bits of a stream.
+CODEWORD_TABLE = [
+    (0, 1, 0) if x & 1 == 0 else
+    (1, 2, 0) if x & 2 == 0 else
+    (2, 3, 0) if x & 4 == 0 else
+    (3, 7, NIBBLE_VALUES[x >> 3])
+    for x in range(128)
+]
+
+
+# Decodes a stream chunk by chunk with a lookup table instead of bit by bit, so only the
+# current chunk and the previous frame are kept in memory. Values are 4 bit unsigned,
+# audio samples are the same in two's complement since both wrap around at 4 bits.
+# Audio is decoded as a video with a single pixel per frame.
+class StreamDecoder:
+    frame_length: int
+    remaining: int
+    version: int
+    width: int
+
+    def __init__(self, frame_length: int, count: int, version: int = 1, width: int = 0):
+        if version == 2 and width <= 0:
+            raise Exception("Version 2 streams can only be decoded with the width of the video.")
+
+        self.frame_length = frame_length
+        self.remaining = count
+        self.version = version
+        self.width = width
+
+        self.previous_frame = [0] * frame_length
+        self.position = 0
+        self.mode = None if version == 2 else FRAME_TEMPORAL
+
+        # Bits that were read from the chunks but not decoded yet, LSB first.
+        self.bits = 0
+        self.bit_count = 0
+
+    # Returns the values of the chunk, code words that continue in the next chunk are kept back.
+    # Once the last chunk is passed (final) all remaining values up to count are returned.
+    def decode(self, chunk: bytes, final: bool = False) -> List[int]:
+        values = []
+
+        # Locals are a lot faster than attributes in the loop.
+        previous_frame = self.previous_frame
+        frame_length = self.frame_length
+        position = self.position
+        remaining = self.remaining
+        mode = self.mode
+        bits = self.bits
+        bit_count = self.bit_count
+        i = 0
+
+        while remaining > 0:
+            # A code word is at most 7 bits long, so one byte always completes it.
+            if bit_count < 7:
+                if i < len(chunk):
+                    bits |= chunk[i] << bit_count
+                    bit_count += 8
+                    i += 1
+                elif not final:
+                    break
+
+            if mode == FRAME_TEMPORAL:
+                codeword, length, value = CODEWORD_TABLE[bits & 0x7F]
+
+                if length > bit_count:
+                    break
+
+                if codeword != 3:
+                    value = (previous_frame[position] + (0, 1, -1)[codeword]) & 0xF
+
+            elif mode is None:
+                if bit_count == 0 or (bit_count == 1 and bits & 1 == 1):
+                    break
+
+                if bits & 1 == 0:
+                    mode = FRAME_TEMPORAL
+                else:
+                    mode = FRAME_INTRA if bits & 2 == 0 else FRAME_SPATIAL
+
+                length = len(FRAME_MODE_BITS[mode])
+                bits >>= length
+                bit_count -= length
+                continue
+
+            elif mode == FRAME_INTRA:
+                if bit_count < 4:
+                    break
+
+                value = NIBBLE_VALUES[bits & 0xF]
+                length = 4
+
+            else:
+                codeword, length, value = CODEWORD_TABLE[bits & 0x7F]
+
+                if length > bit_count:
+                    break
+
+                if codeword != 3:
+                    value = (spatial_prediction(previous_frame, position, self.width) + (0, 1, -1)[codeword]) & 0xF
+
+            bits >>= length
+            bit_count -= length
+
+            values.append(value)
+            previous_frame[position] = value
+            position += 1
+            remaining -= 1
+
+            if position == frame_length:
+                position = 0
+
+                if self.version == 2:
+                    mode = None
+
+        self.position = position
+        self.remaining = remaining
+        self.mode = mode
+        self.bits = bits
+        self.bit_count = bit_count
+
+        return values
+
+
+# Packs the complete bytes of the encoded bits LSB first and removes their bits.
+# pad pads the last bits of a stream to a full byte.
+def pack_bits(encoded_bits: deque, pad: bool = False) -> bytes:
+    # Pad to full bytes
+    if pad:
+        while len(encoded_bits) % 8 != 0:
+            encoded_bits.append(0)
+
+    # Write output bytes
+    encoded = bytearray()
+
+    for i in range(len(encoded_bits) // 8):
+        byte = 0
+
+        for j in range(8):
+            byte |= encoded_bits.popleft() << j
+
+        encoded.append(byte)
+
+    return bytes(encoded)
+
+
+# audio_data consists of Int16 44.1kHz WAVE frames
+# The encoded bytes are yielded after every chunk_length samples, so they can be used before
+# the whole stream is encoded. Code words can continue in the next chunk.
+def audio_encoder_chunks(channels: int, length: int, audio_data: bytes, chunk_length: int) -> Iterator[bytes]:
+    # We assume in HDL the previous sample to be 0 for the first sample.
+    previous_sample = 0
+
+    # Stores the encoded audio data in bits (one bit per index)
+    encoded_bits = deque()
+
+    for start in range(0, length, chunk_length):
+        for i in range(start, min(start + chunk_length, length)):
+            # Sum up the samples across all available channels
+            current_sample = 0
+
+            for j in range(channels):
+                # Samples are Int16 coded by our ffmpeg call.
+                current_sample += int.from_bytes(
+                    audio_data[i*2*channels + j*2:i*2*channels + j*2 + 2],
+                    byteorder="little",
+                    signed=True
+                )
+
+            # Calculate the average of the channels
+            current_sample = int(round(current_sample / channels))
+
+            # Reduce bitwidth to target quality of 4 bits
+            current_sample = int(round(current_sample / (2 ** (2 * 8 - 4))))
+
+            # Since we are rounding and not flooring mono can contain +8 as a sample
+            # which is out of the signed 4 bit range -> clip that to +7.
+            if current_sample == 8:
+                current_sample = 7
+
+            # Since the hardware register will wrap around from +7 to -8 we should implement it aswell.
+            if current_sample - previous_sample == 0:
+                encoded_bits.extend([0])
+
+            elif current_sample - previous_sample == 1 or (current_sample == -8 and previous_sample == 7):
+                encoded_bits.extend([1, 0])
+
+            elif current_sample - previous_sample == -1 or (current_sample == 7 and previous_sample == -8):
+                encoded_bits.extend([1, 1, 0])
+
+            else:
+                encoded_bits.extend([1, 1, 1])
+                for j in range(4):
+                    encoded_bits.append(current_sample >> (4 - 1 - j) & 0b1)
+
+            previous_sample = current_sample
+
+        yield pack_bits(encoded_bits, start + chunk_length >= length)
+
+
+def audio_encoder(channels: int, length: int, audio_data: bytes) -> bytes:
+    return b"".join(audio_encoder_chunks(channels, length, audio_data, max(length, 1)))
+
+
+def audio_decoder(encoded_audio_data: bytes, statistics: DecoderStatistics = None) -> deque:
+    previous_sample = 0
+
+    encoded_bits = deque()
+    for i in range(len(encoded_audio_data)):
+        byte = encoded_audio_data[i]
+        for j in range(8):
+            encoded_bits.append((byte >> j) & 0b1)
+
+    decoded_audio = deque()
+    state = 0
+
+    while len(encoded_bits) > 0:
+        match state:
+            case 0:
+                if encoded_bits.popleft() == 0:
+                    decoded_audio.append(previous_sample)
+
+                    if statistics is not None:
+                        statistics.record(0)
+                else:
+                    state = 1
+
+            case 1:
+                if encoded_bits.popleft() == 0:
+                    current_sample = previous_sample + 1
+                    if current_sample == 8:
+                        current_sample = -8
+
+                    decoded_audio.append(current_sample)
+
+                    if statistics is not None:
+                        statistics.record(1)
+
+                    previous_sample = current_sample
+                    state = 0
+                else:
+                    state = 2
+
+            case 2:
+                if encoded_bits.popleft() == 0:
+                    current_sample = previous_sample - 1
+                    if current_sample == -9:
+                        current_sample = 7
+
+                    codeword = 2
+                else:
+                    codeword = 3
+
+                    # The new sample is Int4 so we need to respect the two's complement
+                    # otherwise it will be parsed as a UInt4
+                    current_sample = 0 \
+                        - 2 ** 3 * encoded_bits.popleft() \
+                        + 2 ** 2 * encoded_bits.popleft() \
+                        + 2 ** 1 * encoded_bits.popleft() \
+                        + 2 ** 0 * encoded_bits.popleft()
+
+                decoded_audio.append(current_sample)
+
+                if statistics is not None:
+                    statistics.record(codeword)
+
+                previous_sample = current_sample
+                state = 0
+
+    return decoded_audio
+
+# video_data is list of deque (1d-frames in grayscale 0-255)
+# The encoded bytes are yielded after every chunk_length frames, code words can continue in the next chunk.
+def video_encoder_chunks(video_data: List[deque], chunk_length: int) -> Iterator[bytes]:
+    framelength = len(video_data[0])
+
+    # Remember that we encode the pixel differences over time,
+    # so every pixel is coded relative to the same pixel of the previous frame.
+    previous_frame = [0] * framelength
+
+    encoded_bits = deque()
+
+    for start in range(0, len(video_data), chunk_length):
+        for i in range(start, min(start + chunk_length, len(video_data))):
+            for j in range(framelength):
+                current_pixel = video_data[i].popleft()
+                current_pixel = int(round(current_pixel / (2 ** (8 - 4))))
+
+                if current_pixel == 16:
+                    current_pixel = 15
+
+                encoded_bits.extend(pixel_codeword(current_pixel, previous_frame[j]))
+                previous_frame[j] = current_pixel
+
+        yield pack_bits(encoded_bits, start + chunk_length >= len(video_data))
+
+
+def video_encoder(video_data: List[deque]) -> bytes:
+    return b"".join(video_encoder_chunks(video_data, max(len(video_data), 1)))
+
+
+# Code word for a pixel compared to the pixel it is predicted by.
+def pixel_codeword(current_pixel: int, predicted_pixel: int) -> List[int]:
+    if current_pixel - predicted_pixel == 0:
+        return [0]
+
+    elif current_pixel - predicted_pixel == 1 or (current_pixel == 0 and predicted_pixel == 15):
+        return [1, 0]
+
+    elif current_pixel - predicted_pixel == -1 or (current_pixel == 15 and predicted_pixel == 0):
+        return [1, 1, 0]
+
+    return [1, 1, 1] + [current_pixel >> (4 - 1 - k) & 0b1 for k in range(4)]
+
+
+# Spatial frames predict a pixel by its left neighbour and the first pixel of a row by the one above.
+def spatial_prediction(frame: List[int], index: int, width: int) -> int:
+    if index % width != 0:
+        return frame[index - 1]
+
+    if index >= width:
+        return frame[index - width]
+
+    return 0
+
+
+# Encodes the video as a version 2 stream where every frame starts with its frame mode.
+# Most frames are coded over time like in video_encoder, but frames that are cheaper to code
+# on their own (e.g. scene cuts) are stored as raw pixels or predicted from their neighbours.
+# If frame_costs is given, the bits of every frame in each mode are appended to it.
+# The encoded bytes are yielded after every chunk_length frames like in video_encoder_chunks.
+def intra_video_encoder_chunks(width: int, video_data: List[deque], chunk_length: int, frame_costs: list = None) -> Iterator[bytes]:
+    framelength = len(video_data[0])
+    previous_frame = [0] * framelength
+
+    encoded_bits = deque()
+
+    for start in range(0, len(video_data), chunk_length):
+        for i in range(start, min(start + chunk_length, len(video_data))):
+            current_frame = []
+
+            for j in range(framelength):
+                current_pixel = int(round(video_data[i].popleft() / (2 ** (8 - 4))))
+
+                if current_pixel == 16:
+                    current_pixel = 15
+
+                current_frame.append(current_pixel)
+
+            temporal = [pixel_codeword(current_frame[j], previous_frame[j]) for j in range(framelength)]
+            spatial = [pixel_codeword(current_frame[j], spatial_prediction(current_frame, j, width)) for j in range(framelength)]
+
+            costs = [sum([len(x) for x in temporal]), 4 * framelength, sum([len(x) for x in spatial])]
+            mode = min([FRAME_TEMPORAL, FRAME_INTRA, FRAME_SPATIAL], key=lambda x: len(FRAME_MODE_BITS[x]) + costs[x])
+
+            if frame_costs is not None:
+                frame_costs.append(costs)
+
+            encoded_bits.extend(FRAME_MODE_BITS[mode])
+
+            if mode == FRAME_INTRA:
+                for current_pixel in current_frame:
+                    encoded_bits.extend([current_pixel >> (4 - 1 - k) & 0b1 for k in range(4)])
+            else:
+                for codeword in (temporal if mode == FRAME_TEMPORAL else spatial):
+                    encoded_bits.extend(codeword)
+
+            previous_frame = current_frame
+
+        yield pack_bits(encoded_bits, start + chunk_length >= len(video_data))
+
+
+def intra_video_encoder(width: int, video_data: List[deque], frame_costs: list = None) -> bytes:
+    return b"".join(intra_video_encoder_chunks(width, video_data, max(len(video_data), 1), frame_costs))
+
+
+# Version 2 streams (see MediaFile.VERSION) need the width of the video for the spatial frames.
+def video_decoder(framelength: int, encoded_video_data: bytes, statistics: DecoderStatistics = None, version: int = 1, width: int = 0) -> deque:
+    if version == 2 and width <= 0:
+        raise Exception("Version 2 streams can only be decoded with the width of the video.")
+
+    previous_frame = [0] * framelength
+    pixel_counter = 0
+
+    # Version 1 streams only contain temporal frames.
+    mode = FRAME_TEMPORAL
+
+    encoded_bits = deque()
+    for i in range(len(encoded_video_data)):
+        byte = encoded_video_data[i]
+        for j in range(8):
+            encoded_bits.append((byte >> j) & 0b1)
+
+    decoded_video = deque()
+    state = 4 if version == 2 else 0
+
+    while len(encoded_bits) > 0:
+        match state:
+            case 0:
+                # Spatial frames are predicted from the pixels of the frame that are decoded already.
+                if mode == FRAME_SPATIAL:
+                    predicted_pixel = spatial_prediction(previous_frame, pixel_counter, width)
+                else:
+                    predicted_pixel = previous_frame[pixel_counter]
+
+                if encoded_bits.popleft() == 0:
+                    decoded_video.append(predicted_pixel)
+                    previous_frame[pixel_counter] = predicted_pixel
+                    pixel_counter += 1
+
+                    if statistics is not None:
+                        statistics.record(0)
+
+                    state = 0
+                else:
+                    state = 1
+
+            case 1:
+                if encoded_bits.popleft() == 0:
+                    current_pixel = predicted_pixel + 1
+                    if current_pixel == 16:
+                        current_pixel = 0
+
+                    decoded_video.append(current_pixel)
+                    previous_frame[pixel_counter] = current_pixel
+                    pixel_counter += 1
+
+                    if statistics is not None:
+                        statistics.record(1)
+
+                    state = 0
+                else:
+                    state = 2
+
+            case 2:
+                if encoded_bits.popleft() == 0:
+                    current_pixel = predicted_pixel - 1
+                    if current_pixel == -1:
+                        current_pixel = 15
+
+                    codeword = 2
+                else:
+                    codeword = 3
+
+                    current_pixel = 0 \
+                        | (encoded_bits.popleft() << 3) \
+                        | (encoded_bits.popleft() << 2) \
+                        | (encoded_bits.popleft() << 1) \
+                        | (encoded_bits.popleft() << 0)
+
+                decoded_video.append(current_pixel)
+                previous_frame[pixel_counter] = current_pixel
+                pixel_counter += 1
+
+                if statistics is not None:
+                    statistics.record(codeword)
+
+                state = 0
+
+            # Raw pixels of an intra frame, this state is kept until the frame ends.
+            case 3:
+                current_pixel = 0 \
+                    | (encoded_bits.popleft() << 3) \
+                    | (encoded_bits.popleft() << 2) \
+                    | (encoded_bits.popleft() << 1) \
+                    | (encoded_bits.popleft() << 0)
+
+                decoded_video.append(current_pixel)
+                previous_frame[pixel_counter] = current_pixel
+                pixel_counter += 1
+
+                if statistics is not None:
+                    statistics.record(4)
+
+            # Frame mode at the start of every frame of version 2 streams.
+            case 4:
+                if encoded_bits.popleft() == 0:
+                    mode = FRAME_TEMPORAL
+                elif encoded_bits.popleft() == 0:
+                    mode = FRAME_INTRA
+                else:
+                    mode = FRAME_SPATIAL
+
+                if statistics is not None:
+                    statistics.start_frame(len(FRAME_MODE_BITS[mode]))
+
+                state = 3 if mode == FRAME_INTRA else 0
+
+        if pixel_counter == framelength:
+            pixel_counter = 0
+
+            if version == 2:
+                state = 4
+
+            # Since we pad the data to full bytes there can be bits remaining.
+            # This can be atmost 7 bits and we need to check for this
+            # when we finished processing a frame (pixel_counter wraps to 0).
+            if len(encoded_bits) < 8:
+                break
+
+    return decoded_video
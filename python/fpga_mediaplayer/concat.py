@@ -0,0 +1,262 @@
+import argparse
+import sys
+import os
+
+from typing import List, Tuple
+
+from .codec import MediaDirectory
+
+# Size of the chunks for copying when the kernel can't copy the files for us.
+CHUNK_SIZE = 1024 * 1024
+
+
+def parse_number(text: str) -> int:
+    if text[0:2] == "0x":
+        return int(text, 16)
+    else:
+        return int(text)
+
+
+def align(position: int, sector_size: int) -> int:
+    return (position + sector_size - 1) // sector_size * sector_size
+
+
+# The directory sits in the sector after the last media file and is found by its signature.
+# A flash that held a longer image before can still contain its directory further back,
+# the first one that only lists media files in front of it is the current one.
+def read_directory(path: str, sector_size: int) -> List[Tuple[int, int]]:
+    signature = MediaDirectory.SIGNATURE_BYTES
+
+    with open(path, "rb") as image_file:
+        for position in range(0, os.path.getsize(path), sector_size):
+            image_file.seek(position)
+
+            if image_file.read(len(signature)) != signature:
+                continue
+
+            image_file.seek(position)
+
+            try:
+                entries = MediaDirectory(image_file.read(sector_size)).ENTRIES
+            except:
+                continue
+
+            if all([offset + length <= position for offset, length in entries]):
+                return entries
+
+    return []
+
+
+def same_contents(image_file, offset: int, media_path: str, length: int) -> bool:
+    image_file.seek(offset)
+
+    with open(media_path, "rb") as media_file:
+        remaining = length
+        while remaining > 0:
+            chunk = media_file.read(min(CHUNK_SIZE, remaining))
+            if len(chunk) == 0 or image_file.read(len(chunk)) != chunk:
+                return False
+
+            remaining -= len(chunk)
+
+    return True
+
+
+def copy_file(source_file, output_file, length: int):
+    # Let the kernel copy the data if it supports it, this way the data
+    # never has to pass through python. Fall back to copying in chunks otherwise.
+    if hasattr(os, "sendfile"):
+        try:
+            offset = 0
+            while offset < length:
+                sent = os.sendfile(output_file.fileno(), source_file.fileno(), offset, length - offset)
+                if sent == 0:
+                    break
+
+                offset += sent
+
+            return
+        except OSError:
+            # sendfile only fails up front for unsupported files,
+            # so nothing has been written yet.
+            pass
+
+    remaining = length
+    while remaining > 0:
+        chunk = source_file.read(min(CHUNK_SIZE, remaining))
+        if len(chunk) == 0:
+            break
+
+        output_file.write(chunk)
+        remaining -= len(chunk)
+
+
+# Builds the flash image and returns the directory entries of the image.
+# The entries of an already concatenated input file come first.
+def build_image(
+    input: str,
+    mediafiles: List[str],
+    output: str,
+    position: int = None,
+    sector_size: int = 0x1000,
+    capacity: int = 0x400000,
+    reference: str = None
+) -> List[Tuple[int, int]]:
+    for path in [input] + mediafiles + ([reference] if reference is not None else []):
+        if not os.path.exists(path):
+            raise Exception("File not found: " + path)
+
+    if sector_size <= 0 or capacity <= 0 or capacity % sector_size != 0:
+        raise Exception("Capacity has to be a positive multiple of the sector size.")
+
+    input_size = os.path.getsize(input)
+
+    # An already concatenated binfile ends with its directory. Keep its
+    # entries and only copy the data in front of the directory.
+    entries = read_directory(input, sector_size)
+
+    if len(entries) > 0:
+        input_size = max([offset + length for offset, length in entries])
+
+    # The directory needs a sector after the media.
+    if align(input_size, sector_size) + sector_size > capacity:
+        raise Exception("Input file does not leave any space for media on the flash.")
+
+    if position is None:
+        position = align(input_size, sector_size)
+
+    if position <= 0:
+        raise Exception("Byte position cannot be zero or negative.")
+
+    if position < input_size:
+        raise Exception("Byte position needs to be after the input file.")
+
+    lengths = [os.path.getsize(mediafile) for mediafile in mediafiles]
+    offsets = [None] * len(mediafiles)
+
+    # Media files that are unchanged since the reference image was flashed
+    # stay where they are, this way their sectors don't have to be reprogrammed.
+    if reference is not None:
+        reference_entries = [
+            (offset, length) for offset, length in read_directory(reference, sector_size)
+            if offset >= position
+        ]
+
+        with open(reference, "rb") as reference_file:
+            for i in range(len(mediafiles)):
+                for offset, length in reference_entries:
+                    if length == lengths[i] and same_contents(reference_file, offset, mediafiles[i], length):
+                        offsets[i] = offset
+                        reference_entries.remove((offset, length))
+                        break
+
+    # Place the remaining media files into the first gap they fit in.
+    occupied = [(offset, length) for offset, length in entries] + [
+        (offsets[i], lengths[i]) for i in range(len(mediafiles)) if offsets[i] is not None
+    ]
+
+    for i in range(len(mediafiles)):
+        if offsets[i] is not None:
+            continue
+
+        offset = position
+        for used_offset, used_length in sorted(occupied):
+            if offset + lengths[i] <= used_offset or used_offset + used_length <= offset:
+                continue
+
+            offset = max(offset, align(used_offset + used_length, sector_size))
+
+        offsets[i] = offset
+        occupied.append((offset, lengths[i]))
+
+        # Only the first media file is placed at the exact position.
+        position = align(position, sector_size)
+
+    entries += list(zip(offsets, lengths))
+
+    if len(entries) > 255:
+        raise Exception("The directory can hold at most 255 media files.")
+
+    # The directory goes into the sector after the last media file, so the image
+    # ends right behind it and only the used part of the flash has to be programmed.
+    directory_position = align(max([offset + length for offset, length in entries]), sector_size)
+
+    if directory_position + sector_size > capacity:
+        raise Exception("Media files do not fit onto the flash, " + str((directory_position + sector_size - capacity + 1023) // 1024) + " K missing.")
+
+    # Unbuffered so the writes go straight to the file descriptor
+    # in between the kernel copies. Skipping over the padding with seek
+    # leaves it as holes in the file instead of writing zeroes.
+    with open(output, "wb", buffering=0) as output_file:
+        # Copy bitfile contents
+        with open(input, "rb") as input_file:
+            copy_file(input_file, output_file, input_size)
+
+        # Insert mediafiles
+        for mediafile, offset, length in zip(mediafiles, offsets, lengths):
+            output_file.seek(offset)
+
+            with open(mediafile, "rb") as media_file:
+                copy_file(media_file, output_file, length)
+
+        # Insert directory
+        output_file.seek(directory_position)
+        output_file.write(MediaDirectory.as_bytes(entries))
+
+    return entries
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="concat",
+        description="Builds a flash image out of a bitfile and one or more media files.\n" +
+                    "\n" +
+                    "Every media file is placed on a flash sector boundary and a directory\n" +
+                    "of all media files is written into the sector after the last one.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-i", "--input", type=str, required=True, help="Input fpga bitfile (or already concatenated binfile)")
+    parser.add_argument("-m", "--mediafile", type=str, required=True, action="append", help="Mediafile to append after the bitfile or at a specific index.\nCan be passed multiple times to build a playlist.")
+    parser.add_argument("-p", "--position", type=str, required=False, help="Place the first mediafile at this byte position (decimal or hex).\nExisting data will not be overwritten.\n(default: next sector after input file)")
+    parser.add_argument("-o", "--output", type=str, required=True, help="Output binfile that contains both files.")
+    parser.add_argument("-s", "--sectorsize", type=str, required=False, default="0x1000", help="Size of a flash sector in bytes (decimal or hex).\n(default: 0x1000)")
+    parser.add_argument("-r", "--reference", type=str, required=False, help="Previously flashed image. Media files that are already\nstored in it keep their offset so they don't need to be reprogrammed.")
+    parser.add_argument("-c", "--capacity", type=str, required=False, default="0x400000", help="Capacity of the flash in bytes (decimal or hex).\n(default: 0x400000)")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(args=argv if argv else ["--help"])
+
+    try:
+        sector_size = parse_number(args.sectorsize)
+        capacity = parse_number(args.capacity)
+    except:
+        print("Sector size or capacity is not a valid number.")
+        return
+
+    position = None
+
+    if args.position is not None:
+        try:
+            position = parse_number(args.position)
+        except:
+            print("Byte position is not a valid hex number.")
+            return
+
+    try:
+        entries = build_image(args.input, args.mediafile, args.output, position, sector_size, capacity, args.reference)
+    except Exception as e:
+        print(str(e))
+        return
+
+    print("Offset".ljust(12) + "Length".ljust(12) + "File")
+
+    names = ["(input file)"] * (len(entries) - len(args.mediafile)) + args.mediafile
+    for (offset, length), name in zip(entries, names):
+        print(hex(offset).ljust(12) + hex(length).ljust(12) + name)
+
+    directory_position = align(max([offset + length for offset, length in entries]), sector_size)
+
+    print()
+    print("Directory: ".ljust(20) + hex(directory_position))
+    print("Image size: ".ljust(20) + str(os.path.getsize(args.output) // 1024) + " K")
+    print("Space left: ".ljust(20) + str((capacity - directory_position - sector_size) // 1024) + " K")
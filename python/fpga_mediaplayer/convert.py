@@ -0,0 +1,850 @@
+import argparse
+import sys
+import os
+import shutil
+import tempfile
+
+import wave
+import time
+import json
+import math
+import queue
+
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from operator import mul
+from typing import Iterator, List, Tuple
+
+# resource is only available on unix systems, peak memory will not be profiled otherwise.
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from .codec import (
+    MediaFile, StreamDecoder, FRAME_TEMPORAL, FRAME_INTRA, FRAME_SPATIAL, FRAME_MODE_BITS,
+    audio_encoder_chunks, video_encoder_chunks, intra_video_encoder_chunks
+)
+from .stats import CODEWORD_NAMES, collect_statistics
+
+# The streams are encoded in chunks of a second (samples or frames),
+# so each chunk can be verified while the next one is encoded.
+AUDIO_CHUNK_LENGTH = 44100
+VIDEO_CHUNK_LENGTH = 24
+
+# Number of chunks that can wait for the verification before the encoder waits for it.
+VERIFY_QUEUE_SIZE = 4
+
+
+# Records wall time, cpu time and peak memory of the processing stages.
+# progress is called with the name of every stage before it starts.
+# Linux can reset the peak memory of the process, so peak_rss is the peak of the stage there.
+# Otherwise it is the peak of the whole process up to the end of the stage (see peak_rss_scope)
+# and only peak_rss_increase tells how much the stage added to it.
+class StageProfiler:
+    stages: dict
+
+    def __init__(self, progress=None):
+        self.stages = {}
+        self.progress = progress
+
+    @staticmethod
+    def cpu_time() -> float:
+        # ffmpeg runs as a child process so its time has to be included aswell.
+        times = os.times()
+        return times.user + times.system + times.children_user + times.children_system
+
+    @staticmethod
+    def peak_rss(children: bool) -> int:
+        if resource is None:
+            return None
+
+        # Linux reports kilobytes, macOS reports bytes.
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    # Sets the peak memory of the process back to the current memory
+    # and returns it, None if the system doesn't support it.
+    @staticmethod
+    def reset_peak_rss() -> int:
+        try:
+            with open("/proc/self/clear_refs", "w") as clear_refs:
+                clear_refs.write("5")
+        except OSError:
+            return None
+
+        return StageProfiler.stage_peak_rss()
+
+    @staticmethod
+    def stage_peak_rss() -> int:
+        try:
+            with open("/proc/self/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+
+        return None
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.progress is not None:
+            self.progress(name)
+
+        start_rss = StageProfiler.reset_peak_rss()
+        per_stage = start_rss is not None
+
+        if not per_stage:
+            start_rss = StageProfiler.peak_rss(False)
+
+        # Children can't be reset, ffmpeg only runs during its stage anyway.
+        start_rss_children = StageProfiler.peak_rss(True)
+
+        wall_time = time.perf_counter()
+        cpu_time = StageProfiler.cpu_time()
+
+        yield
+
+        wall_time = time.perf_counter() - wall_time
+        cpu_time = StageProfiler.cpu_time() - cpu_time
+
+        peak_rss = StageProfiler.stage_peak_rss() if per_stage else StageProfiler.peak_rss(False)
+        peak_rss_children = StageProfiler.peak_rss(True)
+
+        self.stages[name] = {
+            "wall_time": wall_time,
+            "cpu_time": cpu_time,
+            "peak_rss": peak_rss,
+            "peak_rss_scope": "stage" if per_stage else "process",
+            "peak_rss_increase": peak_rss - start_rss if peak_rss is not None and start_rss is not None else None,
+            "peak_rss_children_increase": peak_rss_children - start_rss_children if peak_rss_children is not None else None
+        }
+
+
+# Counts the code words of an encoded stream ("audio" or "video") by their class, like the stats tool.
+# The padding of the last byte decodes as same code words, so only the first count code words are kept.
+def codeword_statistics(stream: str, encoded_data: bytes, count: int, width: int = 0, height: int = 0, version: int = 1) -> dict:
+    audio = encoded_data if stream == "audio" else b""
+    video = encoded_data if stream == "video" else b""
+
+    mediafile = MediaFile(MediaFile.as_bytes(width, height, len(audio), len(video), version) + audio + video)
+    (name, statistics), = collect_statistics(mediafile, stream)
+
+    totals = [sum(counts) for counts in statistics.frame_codewords]
+    totals[0] -= sum(totals) - count
+
+    return dict(zip(CODEWORD_NAMES, totals))
+
+
+# Highest number of bits in any window of consecutive frames.
+def peak_window_bits(frame_bits: List[int], window: int) -> int:
+    peak = current = sum(frame_bits[:window])
+
+    for i in range(window, len(frame_bits)):
+        current += frame_bits[i] - frame_bits[i - window]
+        peak = max(peak, current)
+
+    return peak
+
+
+# Compares the decoded values of a stream with the quantized input and
+# collects the error of the decoded values to the original input.
+class RoundTripCheck:
+    peak: int
+
+    def __init__(self, peak: int):
+        self.peak = peak
+
+        self.values = 0
+        self.mismatches = 0
+        self.first_mismatch = None
+
+        self.max_error = 0
+        self.total_error = 0
+        self.total_squared_error = 0
+
+    def compare(self, decoded: bytes, quantized: bytes, errors: List[int]):
+        if decoded != quantized:
+            mismatches = [i for i in range(len(decoded)) if decoded[i] != quantized[i]]
+
+            if self.first_mismatch is None:
+                self.first_mismatch = self.values + mismatches[0]
+
+            self.mismatches += len(mismatches)
+
+        self.max_error = max(max(errors, default=0), self.max_error)
+        self.total_error += sum(errors)
+        self.total_squared_error += sum(map(mul, errors, errors))
+
+        self.values += len(decoded)
+
+    def result(self, count: int) -> dict:
+        # Values missing at the end of the stream are mismatches aswell.
+        first_mismatch = self.first_mismatch
+        if first_mismatch is None and self.values < count:
+            first_mismatch = self.values
+
+        mean_squared_error = self.total_squared_error / max(self.values, 1)
+
+        return {
+            "values": count,
+            "decoded": self.values,
+            "mismatches": self.mismatches + count - self.values,
+            "first_mismatch": first_mismatch,
+            "max_error": self.max_error,
+            "mean_error": self.total_error / max(self.values, 1),
+            "psnr": 10 * math.log10(self.peak ** 2 / mean_squared_error) if mean_squared_error > 0 else None
+        }
+
+
+# Decodes the encoded audio chunk by chunk and compares it with the input samples.
+# The reference is quantized here independently of the encoder so its mistakes show up.
+class AudioVerification:
+    channels: int
+    length: int
+
+    def __init__(self, channels: int, length: int):
+        self.channels = channels
+        self.length = length
+
+        # Quantized value (as UInt4) of every Int16 sample and its error. Negative samples
+        # are stored at the end of the table so the samples can be used as index directly.
+        # The tables are only built here since this runs in the worker process.
+        self.quantization = [min(round((x if x < 2 ** 15 else x - 2 ** 16) / 2 ** (2 * 8 - 4)), 7) & 0xF for x in range(2 ** 16)]
+        self.quantization_errors = [
+            abs(((q ^ 8) - 8) * 2 ** (2 * 8 - 4) - (x if x < 2 ** 15 else x - 2 ** 16)) for x, q in enumerate(self.quantization)
+        ]
+
+        self.decoder = StreamDecoder(1, length)
+        self.check = RoundTripCheck(2 ** 15)
+
+        # Input of the chunks that is not decoded yet, code words can continue in the next chunk.
+        self.pending = bytearray()
+
+    # reference contains the input samples the chunk was encoded from.
+    def feed(self, encoded_data: bytes, reference: bytes, final: bool = False):
+        self.pending += reference
+        decoded = bytes(self.decoder.decode(encoded_data, final))
+
+        size = len(decoded) * 2 * self.channels
+
+        # WAVE files are little-endian.
+        samples = array("h", self.pending[:size])
+        if sys.byteorder == "big":
+            samples.byteswap()
+
+        del self.pending[:size]
+
+        # Average over the channels like the encoder does.
+        if self.channels == 1:
+            original = samples
+        else:
+            original = [
+                round(sum(sample) / self.channels) for sample in zip(*[samples[j::self.channels] for j in range(self.channels)])
+            ]
+
+        # Samples are decoded as UInt4 and are Int4 in two's complement.
+        quantized = bytes([self.quantization[sample] for sample in original])
+
+        if decoded == quantized:
+            errors = [self.quantization_errors[sample] for sample in original]
+        else:
+            errors = [abs(((value ^ 8) - 8) * 2 ** (2 * 8 - 4) - sample) for value, sample in zip(decoded, original)]
+
+        self.check.compare(decoded, quantized, errors)
+
+    def finish(self) -> dict:
+        self.feed(b"", b"", True)
+
+        return self.check.result(self.length)
+
+
+# Decodes the encoded video chunk by chunk and compares it with the input frames.
+class VideoVerification:
+    count: int
+
+    def __init__(self, width: int, height: int, version: int, framecount: int):
+        self.count = framecount * width * height
+
+        # Quantized value of every pixel and its error.
+        self.quantization = bytes([min(round(x / 2 ** (8 - 4)), 15) for x in range(2 ** 8)])
+        self.quantization_errors = bytes([abs(q * 2 ** (8 - 4) - x) for x, q in enumerate(self.quantization)])
+
+        self.decoder = StreamDecoder(width * height, self.count, version, width)
+        self.check = RoundTripCheck(2 ** 8 - 1)
+
+        # Pixels of the chunks that are not decoded yet.
+        self.pending = bytearray()
+
+    # reference contains the pixels of the frames the chunk was encoded from.
+    def feed(self, encoded_data: bytes, reference: bytes, final: bool = False):
+        self.pending += reference
+        decoded = bytes(self.decoder.decode(encoded_data, final))
+
+        original = self.pending[:len(decoded)]
+        del self.pending[:len(decoded)]
+
+        quantized = original.translate(self.quantization)
+
+        if decoded == quantized:
+            errors = original.translate(self.quantization_errors)
+        else:
+            errors = [abs(value * 2 ** (8 - 4) - pixel) for value, pixel in zip(decoded, original)]
+
+        self.check.compare(decoded, quantized, errors)
+
+    def finish(self) -> dict:
+        self.feed(b"", b"", True)
+
+        return self.check.result(self.count)
+
+
+VERIFICATIONS = {"audio": AudioVerification, "video": VideoVerification}
+
+
+# Runs in the worker process of StreamVerifier. Every stream starts with its name and the arguments
+# of its verification, followed by its chunks and None. The result (or the error) of every stream
+# is returned with its name.
+def verify_streams(requests, responses):
+    for stream, args in iter(requests.get, None):
+        chunks = iter(requests.get, None)
+
+        try:
+            verification = VERIFICATIONS[stream](*args)
+
+            for encoded_data, reference in chunks:
+                verification.feed(encoded_data, reference)
+
+            result = verification.finish()
+        except Exception as error:
+            result = error
+
+        # The rest of a failed stream is still read so the encoder isn't blocked by the queue.
+        for chunk in chunks:
+            pass
+
+        responses.put((stream, result))
+
+
+# Verifies the streams in a worker process while they are encoded. Every encoded chunk is sent
+# to the worker with the input it was encoded from through a bounded queue, so the encoder runs
+# at most VERIFY_QUEUE_SIZE chunks ahead of the worker and neither keeps a copy of a whole stream.
+class StreamVerifier:
+    streams: List[str]
+
+    def __init__(self):
+        # Starting processes takes a while to import, so only load it when it's needed.
+        import multiprocessing
+
+        self.streams = []
+        self.requests = multiprocessing.Queue(VERIFY_QUEUE_SIZE)
+        self.responses = multiprocessing.Queue()
+
+        self.process = multiprocessing.Process(target=verify_streams, args=(self.requests, self.responses), daemon=True)
+        self.process.start()
+
+    # A worker that stopped would never take the chunks or return the results.
+    def check_process(self):
+        if not self.process.is_alive():
+            raise Exception("The verification process stopped unexpectedly.")
+
+    def put(self, request):
+        while True:
+            try:
+                return self.requests.put(request, timeout=1)
+            except queue.Full:
+                self.check_process()
+
+    # Joins the chunks of an encoder and sends every chunk to the worker. references yields
+    # the input of every chunk, zip takes it before the encoder since that consumes the frames.
+    def encode(self, stream: str, args: tuple, chunks: Iterator[bytes], references: Iterator[bytes]) -> bytes:
+        self.put((stream, args))
+        self.streams.append(stream)
+
+        encoded = bytearray()
+
+        for reference, chunk in zip(references, chunks):
+            self.put((chunk, reference))
+            encoded += chunk
+
+        self.put(None)
+
+        return bytes(encoded)
+
+    # Waits for the results of all streams by their name, errors of the worker are raised here.
+    def wait(self) -> dict:
+        results = {}
+
+        while len(results) < len(self.streams):
+            try:
+                stream, result = self.responses.get(timeout=1)
+            except queue.Empty:
+                self.check_process()
+                continue
+
+            if isinstance(result, Exception):
+                raise result
+
+            results[stream] = result
+
+        return results
+
+    # Stops the worker, even in the middle of a stream if the conversion failed.
+    def close(self):
+        self.process.terminate()
+        self.process.join()
+
+        # Chunks that are not sent anymore don't have to be flushed at exit.
+        self.requests.cancel_join_thread()
+
+
+# pyffmpeg takes a while to import and locates the ffmpeg binary,
+# so it is only loaded once something actually needs to be converted.
+def create_ffmpeg():
+    import pyffmpeg
+
+    # Disable logging from pyffmpeg because it's useless for our use-case.
+    import logging
+    logging.getLogger("pyffmpeg.FFmpeg").setLevel(logging.FATAL)
+    logging.getLogger("pyffmpeg.misc.Paths").setLevel(logging.FATAL)
+
+    return pyffmpeg.FFmpeg()
+
+
+def preprocess(ff, input_file: str, resolution: str, temp_dir: str) -> List[str]:
+    audio_command = (
+        "-i \"" + input_file + "\" " +
+        "-ar 44100 -c:a pcm_s16le " +
+        "\"" + os.path.join(temp_dir, "audio.wav") + "\""
+    )
+
+    video_command = (
+        "-i \"" + input_file + "\" " +
+        "-vf \"scale=" + resolution + ",format=gray,fps=24\" " +
+        "\"" + os.path.join(temp_dir, "%05d.png") + "\""
+    )
+
+    ff.options(audio_command)
+    ff.options(video_command)
+
+    # Contains the frames and the audio file output from ffmpeg.
+    # 00001.png, 00002.png, ..., audio.wav
+    return sorted(os.listdir(temp_dir))
+
+
+def read_audio(path: str) -> Tuple[int, int, int, bytes]:
+    audiofile = wave.open(path, "r")
+
+    depth = audiofile.getsampwidth()
+    channels = audiofile.getnchannels()
+    length = audiofile.getnframes()
+    frames = audiofile.readframes(length)
+
+    audiofile.close()
+
+    return depth, channels, length, frames
+
+
+def read_video(paths: List[str]) -> List[deque]:
+    import PIL.Image
+
+    videoframes = []
+
+    for path in paths:
+        frame = PIL.Image.open(path)
+        videoframes.append(deque(frame.getdata(0)))
+        frame.close()
+
+    return videoframes
+
+
+def write_mediafile(path: str, width: int, height: int, encoded_audio_bytes: bytes, encoded_video_bytes: bytes, version: int = 1):
+    file = open(path, "wb+")
+
+    # Generate media header and write file contents
+    header = MediaFile.as_bytes(
+        width,
+        height,
+        len(encoded_audio_bytes),
+        len(encoded_video_bytes),
+        version
+    )
+
+    file.write(header)
+    file.write(encoded_audio_bytes)
+    file.write(encoded_video_bytes)
+
+    file.close()
+
+
+# Converts a media file into the project's format and returns a report with the
+# sizes, timings and (if profile is set) the code word statistics of the streams.
+# The output is only written if a path is given, verbose prints the progress.
+# intra writes a version 2 file which codes scene cuts without the previous frame.
+# verify decodes the encoded streams in a worker process while they are encoded
+# and compares them with the input.
+# ff and temp_dir let long running callers reuse their ffmpeg instance and temporary
+# directory, only the contents of the directory are removed afterwards.
+# progress is called with the name of every stage before it starts, an exception
+# raised by it aborts the conversion.
+def convert_file(
+    input_file: str,
+    output_file: str = None,
+    resolution: str = "32:24",
+    profile: bool = False,
+    verbose: bool = False,
+    intra: bool = False,
+    verify: bool = False,
+    ff=None,
+    temp_dir: str = None,
+    progress=None
+) -> dict:
+    def log(text: str = "", end: str = "\n"):
+        if verbose:
+            print(text, end=end, flush=True)
+
+    if not os.path.exists(input_file):
+        raise Exception("Input file not found.")
+
+    dimensions = resolution.split(":")
+    if len(dimensions) != 2 or any([not x.isnumeric() or int(x) <= 0 for x in dimensions]):
+        raise Exception("Resolution format is incorrect. Example: -r 32:24.")
+
+    # Remove any preceeding zeroes.
+    dimensions = [str(int(x)) for x in dimensions]
+
+    log("=================== File Information ===================")
+
+    log("Input: ".ljust(20) + str(input_file))
+    log("Size: ".ljust(20) + str(int(os.stat(input_file).st_size / 1024)) + " K")
+    log("Output: ".ljust(20) + str(output_file))
+    log("Resolution: ".ljust(20) + dimensions[0] + ":" + dimensions[1])
+    log("Intra coding: ".ljust(20) + ("yes" if intra else "no"))
+
+    log("========================================================")
+
+
+    log()
+    log("================== FFmpeg Processing ===================")
+
+    log("Pre-processing input file...", end="")
+
+    profiler = StageProfiler(progress)
+    report = {
+        "input": input_file,
+        "output": output_file,
+        "resolution": dimensions[0] + ":" + dimensions[1],
+        "stages": profiler.stages
+    }
+
+    own_temp_dir = temp_dir is None
+    if own_temp_dir:
+        temp_dir = tempfile.mkdtemp(None, "fpga_mediaplayer_tmp_")
+
+    # The streams are decoded in a worker process while they are encoded, see StreamVerifier.
+    verifier = StreamVerifier() if verify else None
+
+    try:
+        own_ff = ff is None
+        if own_ff:
+            ff = create_ffmpeg()
+
+        try:
+            with profiler.stage("ffmpeg"):
+                try:
+                    files = preprocess(ff, input_file, resolution, temp_dir)
+                except Exception as error:
+                    log("error!")
+                    log()
+
+                    raise Exception("The media file could not be processed by ffmpeg.\nError raised:\n" + str(error))
+        finally:
+            if own_ff:
+                ff.quit()
+
+        log("done!")
+        log()
+
+        video_available = False
+        audio_available = False
+
+        encoded_audio_bytes = bytes(0)
+        encoded_video_bytes = bytes(0)
+
+        if "audio.wav" in files:
+            log("Audio stream detected.")
+            files.remove("audio.wav")
+            audio_available = True
+        else:
+            log("No audio stream detected")
+
+        if len(files) > 0:
+            log("Video stream detected.")
+            video_available = True
+        else:
+            log("No video stream detected.")
+
+        log("========================================================")
+
+
+        if audio_available:
+            log()
+            log("=================== Audio Processing ===================")
+
+            log("Reading audio file...", end="")
+
+            with profiler.stage("audio_read"):
+                depth, channels, length, frames = read_audio(os.path.join(temp_dir, "audio.wav"))
+
+            log("done!")
+
+
+            log("Encoding audio...", end="")
+
+            with profiler.stage("audio_encode"):
+                chunks = audio_encoder_chunks(channels, length, frames, AUDIO_CHUNK_LENGTH)
+
+                if verify:
+                    encoded_audio_bytes = verifier.encode("audio", (channels, length), chunks, (
+                        frames[i*2*channels:(i+AUDIO_CHUNK_LENGTH)*2*channels] for i in range(0, length, AUDIO_CHUNK_LENGTH)
+                    ))
+                else:
+                    encoded_audio_bytes = b"".join(chunks)
+
+            log("done!")
+            log()
+
+
+            # Print Input file statistics
+            # Reduced Size is the size of the file after quality loss but before compression.
+            uncompressed_audio_size = length * channels * depth
+            reduced_audio_size = uncompressed_audio_size / channels / depth * (4 / 8)
+            encoded_audio_size = len(encoded_audio_bytes)
+            log("Uncompressed Size: ".ljust(20) + str(int(uncompressed_audio_size / 1024)) + " K")
+            log("Reduced Size: ".ljust(20) + str(int(reduced_audio_size / 1024)) + " K")
+            log("Encoded Size: ".ljust(20) + str(int(encoded_audio_size / 1024)) + " K (" + str(round(encoded_audio_size / reduced_audio_size * 100, 2)) + "%)")
+
+            report["audio"] = {
+                "samples": length,
+                "channels": channels,
+                "uncompressed_size": uncompressed_audio_size,
+                "reduced_size": reduced_audio_size,
+                "encoded_size": encoded_audio_size,
+                "samples_per_second": length / max(profiler.stages["audio_encode"]["wall_time"], 1e-9)
+            }
+
+            if profile:
+                report["audio"]["codewords"] = codeword_statistics("audio", encoded_audio_bytes, length)
+
+            log("========================================================")
+
+
+        if video_available:
+            log()
+            log("=================== Video Processing ===================")
+
+            log("Reading video frames...", end="")
+
+            with profiler.stage("video_read"):
+                videoframes = read_video([os.path.join(temp_dir, file) for file in files])
+
+            # The encoder consumes the frames.
+            framecount = len(videoframes)
+
+            log("done!")
+
+
+            log("Encoding video...", end="")
+
+            frame_costs = []
+
+            with profiler.stage("video_encode"):
+                if intra:
+                    chunks = intra_video_encoder_chunks(int(dimensions[0]), videoframes, VIDEO_CHUNK_LENGTH, frame_costs)
+                else:
+                    chunks = video_encoder_chunks(videoframes, VIDEO_CHUNK_LENGTH)
+
+                if verify:
+                    encoded_video_bytes = verifier.encode("video", (int(dimensions[0]), int(dimensions[1]), 2 if intra else 1, framecount), chunks, (
+                        b"".join([bytes(frame) for frame in videoframes[i:i+VIDEO_CHUNK_LENGTH]]) for i in range(0, framecount, VIDEO_CHUNK_LENGTH)
+                    ))
+                else:
+                    encoded_video_bytes = b"".join(chunks)
+
+            log("done!")
+            log()
+
+
+            # Uncompressed Size: #frames * resolution * 3 bytes per pixel
+            framelength = int(dimensions[0]) * int(dimensions[1])
+
+            uncompressed_video_size = framecount * framelength * 3
+            reduced_video_size = framecount * framelength * (4 / 8)
+            encoded_video_size = len(encoded_video_bytes)
+            log("Uncompressed Size: ".ljust(20) + str(int(uncompressed_video_size / 1024)) + " K")
+            log("Reduced Size: ".ljust(20) + str(int(reduced_video_size / 1024)) + " K")
+            log("Encoded Size: ".ljust(20) + str(int(encoded_video_size / 1024)) + " K (" + str(round(encoded_video_size / reduced_video_size * 100, 2)) + "%)")
+
+            report["video"] = {
+                "frames": framecount,
+                "pixels": framecount * framelength,
+                "uncompressed_size": uncompressed_video_size,
+                "reduced_size": reduced_video_size,
+                "encoded_size": encoded_video_size,
+                "pixels_per_second": framecount * framelength / max(profiler.stages["video_encode"]["wall_time"], 1e-9)
+            }
+
+            if intra:
+                # Frames are coded in the cheapest mode, the first cost is the one of the normal temporal coding.
+                frame_modes = [min(range(len(costs)), key=lambda x: len(FRAME_MODE_BITS[x]) + costs[x]) for costs in frame_costs]
+                temporal_bits = [costs[0] for costs in frame_costs]
+                encoded_bits = [len(FRAME_MODE_BITS[mode]) + costs[mode] for mode, costs in zip(frame_modes, frame_costs)]
+
+                # The flash and the video fifo have to keep up with the busiest second.
+                peak_temporal = peak_window_bits(temporal_bits, 24)
+                peak_encoded = peak_window_bits(encoded_bits, 24)
+
+                log("Intra frames: ".ljust(20) + str(frame_modes.count(FRAME_INTRA)) + " raw / " + str(frame_modes.count(FRAME_SPATIAL)) + " spatial")
+                log("Peak bitrate: ".ljust(20) + str(round(peak_encoded / 1000, 1)) + " kbit/s (temporal only: " + str(round(peak_temporal / 1000, 1)) + " kbit/s, " + str(round((peak_encoded - peak_temporal) / max(peak_temporal, 1) * 100, 1)) + "%)")
+                log("Peak frame: ".ljust(20) + str(max(encoded_bits)) + " bits (temporal only: " + str(max(temporal_bits)) + " bits)")
+
+                report["video"]["frame_modes"] = {
+                    "temporal": frame_modes.count(FRAME_TEMPORAL),
+                    "intra": frame_modes.count(FRAME_INTRA),
+                    "spatial": frame_modes.count(FRAME_SPATIAL)
+                }
+                report["video"]["peak_window_bits"] = {
+                    "window": 24,
+                    "temporal": peak_temporal,
+                    "encoded": peak_encoded
+                }
+                report["video"]["peak_frame_bits"] = {
+                    "temporal": max(temporal_bits),
+                    "encoded": max(encoded_bits)
+                }
+
+            if profile:
+                report["video"]["codewords"] = codeword_statistics(
+                    "video", encoded_video_bytes, framecount * framelength, int(dimensions[0]), int(dimensions[1]), 2 if intra else 1
+                )
+
+            log("========================================================")
+
+
+        log()
+        log("======================= Summary ========================")
+
+        if output_file is not None:
+            log("Writing output file...", end="")
+
+            if os.path.exists(output_file):
+                os.remove(output_file)
+
+            with profiler.stage("write"):
+                write_mediafile(
+                    output_file,
+                    int(dimensions[0]) if video_available else 0,
+                    int(dimensions[1]) if video_available else 0,
+                    encoded_audio_bytes,
+                    encoded_video_bytes,
+                    2 if intra and video_available else 1
+                )
+
+            log("done!")
+            log()
+
+        uncompressed_size = 0
+        reduced_size = 0
+        encoded_size = 0
+
+        for stream in ["audio", "video"]:
+            if stream in report:
+                uncompressed_size += report[stream]["uncompressed_size"]
+                reduced_size += report[stream]["reduced_size"]
+                encoded_size += report[stream]["encoded_size"]
+
+        if audio_available or video_available:
+            log("Uncompressed Size: ".ljust(20) + str(int(uncompressed_size / 1024)) + " K")
+            log("Reduced Size: ".ljust(20) + str(int(reduced_size / 1024)) + " K")
+            log("Encoded Size: ".ljust(20) + str(int(encoded_size / 1024)) + " K (" + str(round(encoded_size / reduced_size * 100, 2)) + "%)")
+
+        log("========================================================")
+
+
+        if verify:
+            log()
+            log("===================== Verification =====================")
+
+            log("Verifying output...", end="")
+
+            # Only the time spent waiting for the last chunks adds to the conversion.
+            with profiler.stage("verify"):
+                for stream, check in verifier.wait().items():
+                    report[stream]["verify"] = check
+
+            log("done!")
+            log()
+
+            for stream in verifier.streams:
+                check = report[stream]["verify"]
+                name = stream.capitalize()
+
+                if check["first_mismatch"] is None:
+                    log((name + ": ").ljust(20) + "ok (" + str(check["values"]) + (" samples)" if stream == "audio" else " pixels)"))
+                elif stream == "audio":
+                    log((name + ": ").ljust(20) + "mismatch at sample " + str(check["first_mismatch"]) + " (" + str(round(check["first_mismatch"] / 44100, 2)) + " s), " + str(check["mismatches"]) + " of " + str(check["values"]) + " samples differ")
+                else:
+                    frame, pixel = divmod(check["first_mismatch"], int(dimensions[0]) * int(dimensions[1]))
+                    x, y = pixel % int(dimensions[0]), pixel // int(dimensions[0])
+                    log((name + ": ").ljust(20) + "mismatch at frame " + str(frame) + " pixel " + str(x) + ":" + str(y) + ", " + str(check["mismatches"]) + " of " + str(check["values"]) + " pixels differ")
+
+                log((name + " error: ").ljust(20) + "max " + str(round(check["max_error"], 1)) + " / mean " + str(round(check["mean_error"], 1)) + " / PSNR " + (str(round(check["psnr"], 1)) + " dB" if check["psnr"] is not None else "inf"))
+
+            log("========================================================")
+    finally:
+        if own_temp_dir:
+            shutil.rmtree(temp_dir)
+        else:
+            for file in os.listdir(temp_dir):
+                os.remove(os.path.join(temp_dir, file))
+
+        if verifier is not None:
+            verifier.close()
+
+    return report
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="convert",
+        description="Encodes a given media file to the project's media format.\n" +
+                    "\n" +
+                    "The file is pre-processed by ffmpeg and as such all\n" +
+                    "audio and video formats supported by ffmpeg are usable.\n"
+                    "\n" +
+                    "Output quality will be fixed:\n" +
+                    "  Video: 32:24 (default) at 24 fps\n" +
+                    "  Audio: 1 channel with 4 bit per Sample at 44.100 Hz",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-i", "--input", type=str, required=True, help="Input media file\nIf a WAVE file is passed (.wav) then the video will be left out.")
+    parser.add_argument("-o", "--output", type=str, required=False, help="Output encoded file")
+    parser.add_argument("-r", "--resolution", type=str, required=False, default="32:24", help="Target resolution in w:h.\n(default: 32:24)")
+    parser.add_argument("-p", "--profile", type=str, required=False, help="Write timing, memory and encoder statistics of every stage\nas json to this file")
+    parser.add_argument("-c", "--intra", action="store_true", required=False, help="Code scene cuts as intra frames without the previous frame.\nThe file can only be played by the python scripts.")
+    parser.add_argument("-v", "--verify", action="store_true", required=False, help="Decode the output while converting and compare it with the input.\nReports the first mismatch and the quantization error.")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(args=argv if argv else ["--help"])
+
+    try:
+        report = convert_file(args.input, args.output, args.resolution, args.profile is not None, verbose=True, intra=args.intra, verify=args.verify)
+    except Exception as e:
+        print(str(e))
+        return
+
+    if args.profile is not None:
+        with open(args.profile, "w") as profile_file:
+            json.dump(report, profile_file, indent=4)
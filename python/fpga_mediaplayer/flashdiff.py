@@ -0,0 +1,154 @@
+import argparse
+import sys
+import os
+import json
+import zlib
+
+from typing import List
+
+# Erase granularities and the page size of the MX25L3233F, see the memory documentation.
+SECTOR_SIZE = 4 * 1024
+BLOCK_SIZE = 64 * 1024
+PAGE_SIZE = 256
+
+# Typical durations from the datasheet in seconds, only used to
+# decide whether erasing a whole block is cheaper than single sectors.
+SECTOR_ERASE_TIME = 0.025
+BLOCK_ERASE_TIME = 0.25
+PAGE_PROGRAM_TIME = 0.0005
+
+
+def programmed_pages(sector: bytes) -> int:
+    # Pages that only contain 0xFF are already in the erased state.
+    return sum([
+        1 for i in range(0, len(sector), PAGE_SIZE)
+        if sector[i:i+PAGE_SIZE].count(0xFF) != len(sector[i:i+PAGE_SIZE])
+    ])
+
+
+# The last sector of an image ends with the directory, so it can be shorter than a kilobyte.
+def format_size(size: int) -> str:
+    if size < 1024:
+        return str(size) + " B"
+
+    return str((size + 1023) // 1024) + " K"
+
+
+def program_time(sectors: list) -> float:
+    return sum([programmed_pages(sector) for sector in sectors]) * PAGE_PROGRAM_TIME
+
+
+# Compares two images and returns the sectors to erase and program:
+# erase: [(address, size)], program: [(address, size, crc32)],
+# checksums: [(address, crc32)] of every sector of the new image
+# and the estimated time for the changes and for the full image.
+def diff_images(input: str, reference: str) -> dict:
+    for path in [input, reference]:
+        if not os.path.exists(path):
+            raise Exception("File not found: " + path)
+
+    erase = []
+    program = []
+    checksums = []
+    total_time = 0
+
+    with open(input, "rb") as input_file, open(reference, "rb") as reference_file:
+        address = 0
+
+        while True:
+            block = input_file.read(BLOCK_SIZE)
+            reference_block = reference_file.read(BLOCK_SIZE)
+
+            if len(block) == 0:
+                break
+
+            sectors = [block[i:i+SECTOR_SIZE] for i in range(0, len(block), SECTOR_SIZE)]
+            reference_sectors = [reference_block[i:i+SECTOR_SIZE] for i in range(0, len(block), SECTOR_SIZE)]
+
+            changed = [i for i in range(len(sectors)) if sectors[i] != reference_sectors[i]]
+
+            for i in range(len(sectors)):
+                checksums.append((address + i * SECTOR_SIZE, zlib.crc32(sectors[i])))
+
+            if len(changed) > 0:
+                # Erasing the whole block also wipes the unchanged sectors
+                # which then have to be programmed again.
+                sector_time = len(changed) * SECTOR_ERASE_TIME + program_time([sectors[i] for i in changed])
+                block_time = BLOCK_ERASE_TIME + program_time(sectors)
+
+                if len(block) == BLOCK_SIZE and block_time < sector_time:
+                    erase.append((address, BLOCK_SIZE))
+                    changed = range(len(sectors))
+                    total_time += block_time
+                else:
+                    erase += [(address + i * SECTOR_SIZE, SECTOR_SIZE) for i in changed]
+                    total_time += sector_time
+
+                program += [
+                    (address + i * SECTOR_SIZE, len(sectors[i]), zlib.crc32(sectors[i]))
+                    for i in changed if programmed_pages(sectors[i]) > 0
+                ]
+
+            address += len(block)
+
+    full_time = \
+        (address + BLOCK_SIZE - 1) // BLOCK_SIZE * BLOCK_ERASE_TIME \
+        + (address + PAGE_SIZE - 1) // PAGE_SIZE * PAGE_PROGRAM_TIME
+
+    return {
+        "erase": erase,
+        "program": program,
+        "checksums": checksums,
+        "time": total_time,
+        "full_time": full_time
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="flashdiff",
+        description="Compares a flash image with the image that was flashed last\n" +
+                    "and lists the sectors that need to be erased and programmed.\n" +
+                    "\n" +
+                    "Blocks (64 KB) are erased as a whole if that is faster than\n" +
+                    "erasing the changed sectors (4 KB) one by one.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-i", "--input", type=str, required=True, help="New flash image")
+    parser.add_argument("-r", "--reference", type=str, required=True, help="Flash image that was flashed last")
+    parser.add_argument("-o", "--output", type=str, required=False, help="Write the erase and program lists with checksums as json to this file")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(args=argv if argv else ["--help"])
+
+    try:
+        diff = diff_images(args.input, args.reference)
+    except Exception as e:
+        print(str(e))
+        return
+
+    erase = diff["erase"]
+    program = diff["program"]
+
+    print("Erase:")
+    for erase_address, size in erase:
+        print("  " + hex(erase_address).ljust(12) + format_size(size))
+
+    print("Program:")
+    for program_address, size, checksum in program:
+        print("  " + hex(program_address).ljust(12) + format_size(size).ljust(8) + "crc32 " + format(checksum, "08x"))
+
+    print()
+    print("Erased: ".ljust(20) + format_size(sum([size for _, size in erase])))
+    print("Programmed: ".ljust(20) + format_size(sum([size for _, size, _ in program])))
+    print("Estimated time: ".ljust(20) + str(round(diff["time"], 1)) + " s (full image: " + str(round(diff["full_time"], 1)) + " s)")
+
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            json.dump({
+                "sector_size": SECTOR_SIZE,
+                "block_size": BLOCK_SIZE,
+                "erase": [{"address": a, "size": s} for a, s in erase],
+                "program": [{"address": a, "size": s, "crc32": c} for a, s, c in program],
+                "checksums": [{"address": a, "crc32": c} for a, c in diff["checksums"]]
+            }, output_file, indent=4)
@@ -0,0 +1,618 @@
+import argparse
+import os
+import sys
+import time
+import struct
+import threading
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from .codec import MediaFile, open_mediafile, audio_decoder, video_decoder
+from .concat import parse_number, read_directory
+from .scan import scan_file
+
+
+# Decodes a media file and returns it with its decoded audio samples and video pixels.
+# offset selects a media file inside a flash image or dump.
+def decode_file(path: str, verbose: bool = False, offset: int = 0) -> Tuple[MediaFile, deque, deque]:
+    def log(text: str = "", end: str = "\n"):
+        if verbose:
+            print(text, end=end, flush=True)
+
+    if not os.path.exists(path):
+        raise Exception("Input file does not exist.")
+
+    try:
+        # The file is memory mapped, so only the pages of the
+        # selected media file are read even for a whole flash image.
+        mediafile = open_mediafile(path, offset)
+    except Exception as e:
+        raise Exception("Input file could not be parsed.\nError raised: " + str(e))
+
+    width = mediafile.WIDTH if mediafile.WIDTH != 0 else 32
+    height = mediafile.HEIGHT if mediafile.HEIGHT != 0 else 24
+
+    log("Decoding audio...", end="")
+    audio_queue = audio_decoder(mediafile.AUDIO)
+    log("done!" + (" (No audio stream detected.)" if mediafile.AUDIO_LENGTH == 0 else ""))
+
+    log("Decoding video...", end="")
+    video_queue = video_decoder(width * height, mediafile.VIDEO, None, mediafile.VERSION, width)
+    log("done!" + (" (No video stream detected.)" if mediafile.VIDEO_LENGTH == 0 else ""))
+
+    return mediafile, audio_queue, video_queue
+
+
+# A decoded media file of a playlist. start and end are the positions in samples
+# of the whole playlist, the longer one of the two streams defines the length of the clip.
+class Clip:
+    path: str
+    offset: int
+    mediafile: MediaFile
+    audio_queue: deque
+    video_queue: deque
+    width: int
+    height: int
+    samples: int
+    frames: int
+    length: int
+    start: int
+    end: int
+
+    def __init__(self, path: str, offset: int = 0, verbose: bool = False):
+        self.path = path
+        self.offset = offset
+        self.mediafile, self.audio_queue, self.video_queue = decode_file(path, verbose, offset)
+
+        self.width = self.mediafile.WIDTH if self.mediafile.WIDTH != 0 else 32
+        self.height = self.mediafile.HEIGHT if self.mediafile.HEIGHT != 0 else 24
+
+        self.samples = len(self.audio_queue)
+        self.frames = len(self.video_queue) // self.width // self.height
+
+        self.length = max(self.samples, (self.frames * 44100 + 23) // 24)
+        self.start = 0
+        self.end = self.length
+
+
+# Takes the place of a clip that could not be decoded. It has no length,
+# so playback moves on to the following clip right away.
+class SkippedClip(Clip):
+    error: str
+
+    def __init__(self, path: str, offset: int, width: int, height: int, error: str):
+        self.path = path
+        self.offset = offset
+        self.mediafile = None
+        self.audio_queue = deque()
+        self.video_queue = deque()
+
+        self.width = width
+        self.height = height
+
+        self.samples = 0
+        self.frames = 0
+
+        self.length = 0
+        self.start = 0
+        self.end = 0
+
+        self.error = error
+
+
+# Every input is either a media file or a flash image (or dump) whose media files are played
+# in the order of its directory. Images without a directory are searched for media files.
+# position selects a single media file in every input instead.
+def playlist_entries(paths: List[str], position: int = None, sector_size: int = 0x1000) -> List[Tuple[str, int]]:
+    entries = []
+
+    for path in paths:
+        if not os.path.exists(path):
+            raise Exception("Input file does not exist: " + path)
+
+        if position is not None:
+            try:
+                open_mediafile(path, position)
+            except Exception as e:
+                raise Exception("Input file could not be parsed: " + path + "\nError raised: " + str(e))
+
+            entries.append((path, position))
+            continue
+
+        try:
+            open_mediafile(path)
+            entries.append((path, 0))
+            continue
+        except:
+            pass
+
+        # The directory only lists the media files of the current image, a dump can
+        # still contain older media files behind it that the scan would find aswell.
+        directory = read_directory(path, sector_size)
+        if len(directory) > 0:
+            entries += [(path, offset) for offset, _ in directory]
+            continue
+
+        found = scan_file(path)
+        if len(found) == 0:
+            raise Exception("Input file does not contain any media: " + path)
+
+        entries += [(path, offset) for offset, _ in found]
+
+    return entries
+
+
+# Plays a media file in a window until it ends or the window is closed.
+def play_file(path: str, blocksize: int = 32, verbose: bool = False, offset: int = 0):
+    play_playlist([(path, offset)], blocksize, verbose)
+
+
+# Plays the media files given as (path, offset) one after another without a gap.
+# The next clip is decoded in the background while the current one plays.
+def play_playlist(entries: List[Tuple[str, int]], blocksize: int = 32, verbose: bool = False):
+    # The GUI and audio modules are only needed for playback.
+    import tkinter
+    import pyaudio
+
+    from PIL import ImageTk, ImageDraw
+
+    if int(blocksize) <= 0:
+        raise Exception("Blocksize has to be a positive integer.")
+
+    if len(entries) == 0:
+        raise Exception("The playlist is empty.")
+
+    # Only the first clip is decoded up front, errors of the other clips show up once they are needed.
+    clips = {0: Clip(entries[0][0], entries[0][1], verbose)}
+    loading = {}
+    clips_lock = threading.Lock()
+    preloader = ThreadPoolExecutor(max_workers=1)
+
+    # Clips shorter than this would end before the following clip is decoded,
+    # so the clip after them is decoded right away aswell.
+    PRELOAD_SAMPLES = 2 * 44100
+
+    # Clips that fail to decode are skipped, so the one after them is needed right away aswell.
+    def preloaded(index: int, future):
+        if future.exception() is not None or future.result().length < PRELOAD_SAMPLES:
+            preload(index + 1)
+
+    def preload(index: int):
+        with clips_lock:
+            if index >= len(entries) or index in clips or index in loading:
+                return
+
+            # The playback can take the future out of loading as soon as the lock is released.
+            future = preloader.submit(Clip, entries[index][0], entries[index][1])
+            loading[index] = future
+
+        future.add_done_callback(lambda future: preloaded(index, future))
+
+    # Returns the clip if it is decoded already, None otherwise.
+    # The clip starts exactly where the previous one ends.
+    # This runs in the audio and video callbacks, so a clip that can't be decoded
+    # must not raise here, it is reported and skipped instead.
+    def loaded_clip(index: int) -> Clip:
+        with clips_lock:
+            if index not in clips:
+                if index not in loading or not loading[index].done():
+                    return None
+
+                future = loading.pop(index)
+                path, offset = entries[index]
+
+                try:
+                    clip = future.result()
+                except Exception as error:
+                    print(
+                        "Skipping clip " + str(index + 1) + " (" + path + (" @ " + hex(offset) if offset != 0 else "") + "): " +
+                        str(error), flush=True
+                    )
+
+                    previous = clips[index - 1]
+                    clip = SkippedClip(path, offset, previous.width, previous.height, str(error))
+
+                clip.start = clips[index - 1].end
+                clip.end = clip.start + clip.length
+                clips[index] = clip
+
+            return clips[index]
+
+    def release_clips():
+        with clips_lock:
+            for index in [index for index in clips if index < min(audio_index, video_index)]:
+                del clips[index]
+
+    # This is done for readability purposes, otherwise the code looks bloated.
+    WIDTH = clips[0].width
+    HEIGHT = clips[0].height
+    BLOCK_SIZE = blocksize
+
+
+    muted = False
+    def toggle_mute(event):
+        nonlocal muted
+        muted = not muted
+
+    playing = True
+    last_pause_time = 0
+    total_pause = 0
+
+    def toggle_playstate(event):
+        nonlocal playing, last_pause_time, total_pause
+
+        playing = not playing
+        now_time = time.time()
+
+        if playing:
+            total_pause += now_time - last_pause_time
+            audio_stream.start_stream()
+
+        else:
+            audio_stream.stop_stream()
+            last_pause_time = now_time
+
+
+    tk = tkinter.Tk()
+    tk.title("fpga-mediaplayer")
+    tk.bind("<Escape>", lambda event: tk.destroy())
+    tk.bind("<space>", toggle_playstate)
+    tk.bind("m", toggle_mute)
+
+    canvas = tkinter.Canvas(tk, width=WIDTH * BLOCK_SIZE, height=HEIGHT * BLOCK_SIZE)
+    canvas.pack()
+
+    frame_image = None
+    frame_draw = None
+    frame_photo = None
+    canvas_image = None
+
+    # The window stays open for the whole playlist and only changes its size for another resolution.
+    def resize(width: int, height: int):
+        nonlocal WIDTH, HEIGHT, frame_image, frame_draw, frame_photo, canvas_image
+
+        WIDTH = width
+        HEIGHT = height
+
+        tk.minsize(WIDTH * BLOCK_SIZE, HEIGHT * BLOCK_SIZE)
+        tk.maxsize(WIDTH * BLOCK_SIZE, HEIGHT * BLOCK_SIZE)
+
+        tk.geometry(
+            "{}x{}+{}+{}".format(
+                WIDTH * BLOCK_SIZE,
+                HEIGHT * BLOCK_SIZE,
+                (tk.winfo_screenwidth() - WIDTH * BLOCK_SIZE) // 2,
+                (tk.winfo_screenheight() - HEIGHT * BLOCK_SIZE) // 2
+            )
+        )
+
+        canvas.configure(width=WIDTH * BLOCK_SIZE, height=HEIGHT * BLOCK_SIZE)
+
+        frame_image = ImageTk.Image.new("L", (WIDTH * BLOCK_SIZE, HEIGHT * BLOCK_SIZE))
+        frame_draw = ImageDraw.Draw(frame_image)
+        frame_photo = ImageTk.PhotoImage(frame_image)
+
+        if canvas_image is None:
+            canvas_image = canvas.create_image(0, 0, anchor="nw", image=frame_photo)
+        else:
+            canvas.itemconfigure(canvas_image, image=frame_photo)
+
+    resize(WIDTH, HEIGHT)
+
+
+    # Both streams run through the playlist on their own, the audio is usually ahead
+    # since PyAudio requests the samples shortly before they are played.
+    audio_index = 0
+    audio_clip = clips[0]
+
+    samples_skipped = 0
+    samples_played = 0
+
+    # Set by the audio callback if the next clip is not decoded yet when the current one ends.
+    waiting = False
+
+    # Takes up to count samples from the playlist, clips without audio
+    # or with a shorter audio stream than video stream are filled up with silence.
+    def take_samples(count: int) -> List[int]:
+        nonlocal audio_index, audio_clip, samples_played, waiting
+
+        samples = []
+
+        while len(samples) < count:
+            if samples_played == audio_clip.end:
+                clip = loaded_clip(audio_index + 1)
+
+                if clip is None:
+                    waiting = audio_index + 1 < len(entries)
+                    break
+
+                audio_index += 1
+                audio_clip = clip
+
+                preload(audio_index + 1)
+
+            insertable_samples = min(count - len(samples), audio_clip.end - samples_played)
+            available_samples = min(insertable_samples, len(audio_clip.audio_queue))
+
+            samples += [audio_clip.audio_queue.popleft() for _ in range(available_samples)]
+            samples += [0] * (insertable_samples - available_samples)
+
+            samples_played += insertable_samples
+
+        return samples
+
+    def audio_callback(in_data, frame_count, time_info, status):
+        nonlocal samples_skipped
+
+        # PyAudio will start skewing if we keep start and stopping the audio stream
+        # or if it can't keep up with the framerate.
+        # It results in slower playback due to the overhead so we need to remove
+        # the samples that should not be in there anymore.
+        total_elapsed_time = time.time() - playback_started_time - total_pause
+        expected_elapsed_samples = int(total_elapsed_time * 44100)
+        samples_behind = expected_elapsed_samples - samples_played
+
+        # Pyaudio calls this callback shortly before the data is necesssary
+        # so the expected_elapsed_samples does not really match.
+        # Otherwise we would also have it elastic like the video_callback
+        # to insert more samples when we are below the skipping threshold.
+
+        # Start skipping samples if we are behind.
+        if samples_behind > 0 and not waiting:
+            samples_skipped += len(take_samples(samples_behind))
+
+        samples = take_samples(frame_count) if not waiting else []
+
+        # The selected playback format is Int8 so the Int4 data needs to be expanded.
+        # If the next clip is not ready yet the rest is filled with silence until playback is paused.
+        packed_samples = struct.pack(
+            f"{frame_count}b",
+            *[sample << 4 for sample in samples] + [0] * (frame_count - len(samples))
+        )
+
+        if muted:
+            packed_samples = bytes(frame_count)
+
+        return (packed_samples, pyaudio.paContinue)
+
+    audio_manager = pyaudio.PyAudio()
+    audio_stream = audio_manager.open(
+        rate=44100,
+        channels=1,
+        format=pyaudio.paInt8,
+        output=True,
+        start=False,
+        stream_callback=audio_callback
+    )
+
+
+    video_index = 0
+    video_clip = clips[0]
+
+    frames_played = 0
+    frames_skipped = 0
+
+    def frame_time(frame: int) -> float:
+        return video_clip.start / 44100 + frame / 24
+
+    def video_callback():
+        nonlocal frames_played, frames_skipped
+        nonlocal last_framedecode_time
+        nonlocal frame_photo
+        nonlocal video_index, video_clip
+
+        if not playing:
+            tk.after(2, video_callback)
+            return
+
+        now_time = time.time()
+        play_time = now_time - playback_started_time - total_pause
+
+        # Switch to the next clip once the current one has ended,
+        # the first frame of it starts right where the last clip ended.
+        if frames_played == video_clip.frames:
+            if play_time < video_clip.end / 44100:
+                tk.after(max(int(round((video_clip.end / 44100 - play_time) * 1000)), 1), video_callback)
+                return
+
+            clip = loaded_clip(video_index + 1)
+
+            if clip is None:
+                if video_index + 1 < len(entries):
+                    tk.after(2, video_callback)
+
+                return
+
+            video_index += 1
+            video_clip = clip
+            frames_played = 0
+            frames_skipped = 0
+
+            preload(video_index + 1)
+            release_clips()
+
+            if (video_clip.width, video_clip.height) != (WIDTH, HEIGHT):
+                resize(video_clip.width, video_clip.height)
+
+            # Clips without video show a black frame, skipped clips are over right away.
+            if video_clip.frames == 0 and video_clip.length > 0:
+                frame_draw.rectangle((0, 0, WIDTH * BLOCK_SIZE, HEIGHT * BLOCK_SIZE), fill=0)
+                frame_photo = ImageTk.PhotoImage(frame_image)
+                canvas.itemconfigure(canvas_image, image=frame_photo)
+
+            tk.after(1, video_callback)
+            return
+
+        # Frameskip implementation analoguous to the one in audio_callback.
+        expected_elapsed_frames = int((play_time - video_clip.start / 44100) * 24)
+        frames_behind = min(expected_elapsed_frames - frames_played, video_clip.frames - frames_played)
+
+        # Start skipping frames if we are more than one frame behind.
+        # If not, the rescheduling of the video_callback will be done
+        # automatically with a lower delay so we can catch back up.
+        if frames_behind > 1:
+            for i in range(frames_behind * WIDTH * HEIGHT):
+                video_clip.video_queue.popleft()
+
+            frames_played += frames_behind
+            frames_skipped += frames_behind
+
+            delay = max(int(round((frame_time(frames_played) - play_time) * 1000)), 1)
+            tk.after(delay, video_callback)
+            return
+
+
+        for y in range(HEIGHT):
+            for x in range(WIDTH):
+                frame_draw.rectangle(
+                    (
+                        x * BLOCK_SIZE,
+                        y * BLOCK_SIZE,
+                        (x+1) * BLOCK_SIZE,
+                        (y+1) * BLOCK_SIZE
+                    ),
+                    fill=video_clip.video_queue.popleft() << 4
+                )
+
+        frame_photo = ImageTk.PhotoImage(frame_image)
+        canvas.itemconfigure(canvas_image, image=frame_photo)
+
+        frametimes.append(now_time - last_framedecode_time)
+        last_framedecode_time = now_time
+        frames_played += 1
+
+
+        # Instead of sleeping 1ms and checking if we need to display the frame
+        # we will just sleep the time until the frame is supposed to be played.
+        # This works remarkably well if the decoding process only takes a millisecond or two
+        # otherwise it will not play on time.
+        delay = max(int(round((frame_time(frames_played) - play_time) * 1000)), 1)
+        tk.after(delay, video_callback)
+
+
+    waiting_paused = False
+
+    def update_title():
+        nonlocal waiting, waiting_paused, last_pause_time
+
+        # The audio reached the end of the clip before the next one was decoded. Playback pauses
+        # exactly at the end of the clip until it is ready, so nothing has to be skipped afterwards.
+        if waiting:
+            if loaded_clip(audio_index + 1) is not None:
+                waiting = False
+
+                if waiting_paused:
+                    waiting_paused = False
+                    toggle_playstate(None)
+
+            elif playing and time.time() - playback_started_time - total_pause >= audio_clip.end / 44100:
+                toggle_playstate(None)
+                last_pause_time = playback_started_time + total_pause + audio_clip.end / 44100
+                waiting_paused = True
+
+        clip = video_clip
+
+        title = \
+            f"fpga-mediaplayer" \
+            + f" - {clip.path}" \
+            + (f" @ {hex(clip.offset)}" if clip.offset != 0 else "") \
+            + (f" - Clip: {video_index + 1} / {len(entries)}" if len(entries) > 1 else "")
+
+        if clip.frames > 0:
+            fps = round(len(frametimes) / sum(frametimes), 1)
+
+            title += "" \
+                + f" - {fps} fps" \
+                + f" - Frame: {frames_played} / {clip.frames} ({frames_skipped} skipped)"
+        else:
+            title += " - No Video"
+
+        if clip.samples > 0:
+            trackposition = max(min(samples_played, clip.end) - clip.start, 0) // 44100
+
+            title += "" \
+                + f" - Audio: {trackposition} / {clip.samples // 44100} secs ({samples_skipped} samples skipped)" \
+                + (" [Muted]" if muted else "")
+        else:
+            title += " - No Audio"
+
+        if waiting_paused:
+            title += " [Loading]"
+        elif not playing:
+            title += " [Paused]"
+
+        tk.title(title)
+
+        # The playlist ends with the longer stream of the last clip.
+        if video_index < len(entries) - 1 or samples_played < video_clip.end or frames_played < video_clip.frames:
+            tk.after(5, update_title)
+        else:
+            tk.destroy()
+
+    playback_started_time = time.time()
+
+    frametimes = deque([.1], 24)
+    last_framedecode_time = time.time()
+
+    preload(1)
+
+    audio_stream.start_stream()
+
+    tk.after(1, video_callback)
+    tk.after(1, update_title)
+
+    try:
+        tk.mainloop()
+    finally:
+        audio_stream.close()
+        audio_manager.terminate()
+
+        # Don't wait for a clip that is still being decoded.
+        preloader.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="player",
+        description="Plays files that were encoded in the project's media format.\n" +
+                    "\n" +
+                    "Multiple files and flash images are played one after another\n" +
+                    "without a gap, the next file is decoded while the current one plays.\n" +
+                    "\n" +
+                    "Press [Space] to pause and [m] to mute.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-i", "--input", type=str, required=True, action="append", help="Input media file or flash image with multiple media files.\nCan be passed multiple times to play a playlist.")
+    parser.add_argument("-b", "--blocksize", action="store", default=32, type=int, required=False, help="Scales a pixel by this amount for a bigger preview window.\n(default: 32)")
+    parser.add_argument("-p", "--position", type=str, required=False, help="Byte position of the media file inside the inputs (decimal or hex).\nUse the scan script to find the media files in a flash image.\n(default: all media files of a flash image)")
+    parser.add_argument("-s", "--sectorsize", type=str, required=False, default="0x1000", help="Size of a flash sector in bytes (decimal or hex), used to find\nthe directory of a flash image.\n(default: 0x1000)")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(args=argv if argv else ["--help"])
+
+    position = None
+
+    if args.position is not None:
+        try:
+            position = parse_number(args.position)
+        except:
+            print("Byte position is not a valid number.")
+            return
+
+    try:
+        sector_size = parse_number(args.sectorsize)
+    except:
+        print("Sector size is not a valid number.")
+        return
+
+    if sector_size <= 0:
+        print("Sector size has to be a positive integer.")
+        return
+
+    try:
+        entries = playlist_entries(args.input, position, sector_size)
+        play_playlist(entries, args.blocksize, verbose=True)
+    except Exception as e:
+        print(str(e))
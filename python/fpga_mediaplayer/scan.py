@@ -0,0 +1,128 @@
+import argparse
+import sys
+import os
+import re
+import mmap
+
+from typing import List, Tuple
+
+from .codec import MediaFile
+from .concat import parse_number, read_directory
+
+# A header starts with "A" (or "B" for version 2) and ends with "Z" eleven bytes later.
+# The regex engine searches the whole buffer in C so python only has to look at the candidates.
+HEADER_PATTERN = re.compile(b"[AB](?=.{10}Z)", re.DOTALL)
+
+
+def plausible(mediafile: MediaFile, offset: int, size: int) -> bool:
+    if mediafile.AUDIO_LENGTH + mediafile.VIDEO_LENGTH == 0:
+        return False
+
+    # Both streams have to end inside the file.
+    if offset + 12 + mediafile.AUDIO_LENGTH + mediafile.VIDEO_LENGTH > size:
+        return False
+
+    # convert.py only writes a resolution if there is a video stream.
+    if (mediafile.WIDTH == 0) != (mediafile.HEIGHT == 0):
+        return False
+
+    if (mediafile.VIDEO_LENGTH == 0) != (mediafile.WIDTH == 0):
+        return False
+
+    # Every pixel takes at least one bit, so there has to be at least one frame.
+    return mediafile.VIDEO_LENGTH * 8 >= mediafile.WIDTH * mediafile.HEIGHT
+
+
+# Returns all media files in data (bytes or a memory map) as (offset, mediafile).
+# Candidates that start inside an already found media file are skipped,
+# their header is most likely just a coincidence in the encoded data.
+def scan_buffer(data: bytes) -> List[Tuple[int, MediaFile]]:
+    found = []
+    end = 0
+
+    for match in HEADER_PATTERN.finditer(data):
+        offset = match.start()
+
+        if offset < end:
+            continue
+
+        mediafile = MediaFile(data, offset)
+
+        if plausible(mediafile, offset, len(data)):
+            found.append((offset, mediafile))
+            end = offset + 12 + mediafile.AUDIO_LENGTH + mediafile.VIDEO_LENGTH
+
+    return found
+
+
+# Memory maps a flash dump or image and returns the media files in it.
+# The streams of the media files reference the map, nothing is read up front.
+def scan_file(path: str) -> List[Tuple[int, MediaFile]]:
+    if not os.path.exists(path):
+        raise Exception("File not found: " + path)
+
+    # Empty files can't be mapped.
+    if os.path.getsize(path) == 0:
+        return []
+
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return scan_buffer(mapped)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="scan",
+        description="Searches a flash dump or concatenated image for media files.\n" +
+                    "\n" +
+                    "The found offsets can be passed to the player and stats scripts\n" +
+                    "with --position to open the media directly from the image.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-i", "--input", type=str, required=True, help="Flash dump or concatenated binfile")
+    parser.add_argument("-s", "--sectorsize", type=str, required=False, default="0x1000", help="Size of a flash sector in bytes (decimal or hex).\n(default: 0x1000)")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(args=argv if argv else ["--help"])
+
+    try:
+        sector_size = parse_number(args.sectorsize)
+    except:
+        print("Sector size is not a valid number.")
+        return
+
+    if sector_size <= 0:
+        print("Sector size has to be a positive integer.")
+        return
+
+    try:
+        found = scan_file(args.input)
+    except Exception as e:
+        print(str(e))
+        return
+
+    # Compare against the directory if the image has one.
+    entries = read_directory(args.input, sector_size)
+
+    print("Offset".ljust(12) + "Length".ljust(12) + "Resolution".ljust(12) + "Audio".ljust(12) + "Video".ljust(12) + "Directory")
+
+    for offset, mediafile in found:
+        length = 12 + mediafile.AUDIO_LENGTH + mediafile.VIDEO_LENGTH
+
+        print(
+            hex(offset).ljust(12) + hex(length).ljust(12) +
+            (str(mediafile.WIDTH) + ":" + str(mediafile.HEIGHT) if mediafile.VIDEO_LENGTH > 0 else "-").ljust(12) +
+            hex(mediafile.AUDIO_LENGTH).ljust(12) +
+            hex(mediafile.VIDEO_LENGTH).ljust(12) +
+            ("yes" if (offset, length) in entries else "no" if entries else "-")
+        )
+
+    offsets = [offset for offset, _ in found]
+    missing = [(offset, length) for offset, length in entries if offset not in offsets]
+
+    print()
+    print("Media files: ".ljust(20) + str(len(found)))
+
+    if entries:
+        print("Directory entries: ".ljust(20) + str(len(entries)) + (" (" + str(len(missing)) + " without a valid header)" if missing else ""))
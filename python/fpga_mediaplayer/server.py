@@ -0,0 +1,342 @@
+import argparse
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import itertools
+import queue
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List
+
+from .convert import create_ffmpeg, convert_file
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# Rough share of the conversion that is done once a stage starts.
+STAGE_PROGRESS = {
+    "ffmpeg": 0.0,
+    "audio_read": 0.2,
+    "audio_encode": 0.25,
+    "video_read": 0.5,
+    "video_encode": 0.6,
+    "write": 0.9,
+    "verify": 0.95
+}
+
+# Every worker process keeps its ffmpeg instance and temporary directory
+# around for all the jobs it runs. The directories are created inside the
+# one of the job queue so they are removed together when it shuts down.
+worker_ffmpeg = None
+worker_temp_dir = None
+
+
+def warm_up(temp_dir: str):
+    global worker_ffmpeg, worker_temp_dir
+
+    worker_ffmpeg = create_ffmpeg()
+    worker_temp_dir = tempfile.mkdtemp(None, "worker_", temp_dir)
+
+
+def convert_job(job_id: int, input_file: str, resolution: str, intra: bool, verify: bool, output_file: str, progress, cancelled) -> dict:
+    # Running jobs can only be cancelled in between the stages
+    # since the encoders can't be interrupted.
+    def advance(stage: str):
+        if job_id in cancelled:
+            raise JobCancelled()
+
+        progress[job_id] = (stage, STAGE_PROGRESS.get(stage, 0.0))
+
+    report = convert_file(
+        input_file,
+        output_file,
+        resolution,
+        intra=intra,
+        verify=verify,
+        ff=worker_ffmpeg,
+        temp_dir=worker_temp_dir,
+        progress=advance
+    )
+
+    progress[job_id] = ("done", 1.0)
+
+    return report
+
+
+class Job:
+    id: int
+    input: str
+    resolution: str
+    priority: int
+    output: str
+    intra: bool
+    verify: bool
+    status: str
+    error: str
+    report: dict
+
+    def __init__(self, id: int, input: str, resolution: str, priority: int, output: str, intra: bool = False, verify: bool = False):
+        self.id = id
+        self.input = input
+        self.resolution = resolution
+        self.priority = priority
+        self.output = output
+        self.intra = intra
+        self.verify = verify
+        self.status = "queued"
+        self.error = None
+        self.report = None
+
+
+# initializer is run in every worker process before its first job.
+class JobQueue:
+    def __init__(self, workers: int, directory: str, initializer=warm_up):
+        self.directory = directory
+
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+        # Higher priorities are dequeued first, equal ones in submission order.
+        self.queue = queue.PriorityQueue()
+
+        # Shared with the worker processes to report progress and cancel jobs.
+        # The workers are started from the dispatcher threads while the http server runs,
+        # forking a process with threads can deadlock, so they are spawned instead.
+        context = multiprocessing.get_context("spawn")
+
+        self.manager = context.Manager()
+        self.progress = self.manager.dict()
+        self.cancelled = self.manager.dict()
+
+        self.temp_dir = tempfile.mkdtemp(None, "fpga_mediaplayer_tmp_")
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=initializer, initargs=(self.temp_dir,))
+
+        # One dispatcher per worker so at most that many jobs are handed to the pool
+        # and the remaining ones stay in the priority queue.
+        for _ in range(workers):
+            threading.Thread(target=self.dispatch, daemon=True).start()
+
+    def submit(self, input: str, resolution: str, priority: int, intra: bool = False, verify: bool = False) -> Job:
+        with self.lock:
+            id = next(self.ids)
+            job = Job(id, input, resolution, priority, os.path.join(self.directory, str(id) + ".bin"), intra, verify)
+            self.jobs[id] = job
+
+        self.queue.put((-priority, id))
+        return job
+
+    def cancel(self, id: int) -> bool:
+        with self.lock:
+            job = self.jobs[id]
+
+            if job.status == "queued":
+                job.status = "cancelled"
+            elif job.status == "running":
+                self.cancelled[id] = True
+            else:
+                return False
+
+        return True
+
+    def status(self, job: Job) -> dict:
+        stage, fraction = self.progress.get(job.id, (None, 0.0))
+
+        return {
+            "id": job.id,
+            "input": job.input,
+            "resolution": job.resolution,
+            "priority": job.priority,
+            "intra": job.intra,
+            "verify": job.verify,
+            "status": job.status,
+            "stage": stage,
+            "progress": fraction,
+            "error": job.error,
+            "report": job.report
+        }
+
+    def dispatch(self):
+        while True:
+            _, id = self.queue.get()
+
+            with self.lock:
+                job = self.jobs[id]
+
+                if job.status != "queued":
+                    continue
+
+                job.status = "running"
+
+            future = self.pool.submit(
+                convert_job, job.id, job.input, job.resolution, job.intra, job.verify, job.output, self.progress, self.cancelled
+            )
+
+            try:
+                job.report = future.result()
+                status = "done"
+            except JobCancelled:
+                status = "cancelled"
+            except Exception as error:
+                status = "failed"
+                job.error = str(error)
+
+            with self.lock:
+                job.status = status
+
+    def shutdown(self):
+        # Running jobs stop after their current stage, the workers have
+        # to be done with their directories before they can be removed.
+        with self.lock:
+            for job in self.jobs.values():
+                if job.status == "running":
+                    self.cancelled[job.id] = True
+
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.manager.shutdown()
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    # GET    /jobs              list all jobs
+    # POST   /jobs              submit a job: {"input": path, "resolution": "32:24", "priority": 0, "intra": false, "verify": false}
+    # GET    /jobs/<id>         status and progress of a job
+    # GET    /jobs/<id>/result  encoded media file of a finished job
+    # DELETE /jobs/<id>         cancel a job
+
+    def send_json(self, code: int, data):
+        body = json.dumps(data).encode()
+
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def find_job(self) -> Job:
+        parts = self.path.strip("/").split("/")
+
+        if len(parts) < 2 or parts[0] != "jobs" or not parts[1].isnumeric():
+            self.send_json(404, {"error": "Not found."})
+            return None
+
+        job = self.server.jobs.jobs.get(int(parts[1]))
+        if job is None:
+            self.send_json(404, {"error": "Job does not exist."})
+
+        return job
+
+    def do_GET(self):
+        jobs = self.server.jobs
+
+        if self.path.strip("/") == "jobs":
+            self.send_json(200, [jobs.status(job) for job in list(jobs.jobs.values())])
+            return
+
+        job = self.find_job()
+        if job is None:
+            return
+
+        if not self.path.rstrip("/").endswith("/result"):
+            self.send_json(200, jobs.status(job))
+            return
+
+        if job.status != "done":
+            self.send_json(409, {"error": "Job is " + job.status + "."})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(job.output)))
+        self.end_headers()
+
+        with open(job.output, "rb") as file:
+            shutil.copyfileobj(file, self.wfile)
+
+    def do_POST(self):
+        if self.path.strip("/") != "jobs":
+            self.send_json(404, {"error": "Not found."})
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            input = str(request["input"])
+            resolution = str(request.get("resolution", "32:24"))
+            priority = int(request.get("priority", 0))
+            intra = bool(request.get("intra", False))
+            verify = bool(request.get("verify", False))
+        except Exception:
+            self.send_json(400, {"error": "Request has to contain a json object with an input file."})
+            return
+
+        if not os.path.exists(input):
+            self.send_json(400, {"error": "Input file not found."})
+            return
+
+        dimensions = resolution.split(":")
+        if len(dimensions) != 2 or any([not x.isnumeric() or int(x) <= 0 for x in dimensions]):
+            self.send_json(400, {"error": "Resolution format is incorrect. Example: 32:24."})
+            return
+
+        job = self.server.jobs.submit(input, resolution, priority, intra, verify)
+        self.send_json(201, self.server.jobs.status(job))
+
+    def do_DELETE(self):
+        job = self.find_job()
+        if job is None:
+            return
+
+        if self.server.jobs.cancel(job.id):
+            self.send_json(200, self.server.jobs.status(job))
+        else:
+            self.send_json(409, {"error": "Job is " + job.status + "."})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="server",
+        description="Runs a local conversion service that keeps its workers warm\n" +
+                    "so many media files can be converted without paying the\n" +
+                    "startup cost of convert.py for every single one.\n" +
+                    "\n" +
+                    "Jobs are submitted, polled and fetched over http, see client.py.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-H", "--host", type=str, required=False, default="127.0.0.1", help="Address to listen on\n(default: 127.0.0.1)")
+    parser.add_argument("-P", "--port", type=int, required=False, default=8765, help="Port to listen on\n(default: 8765)")
+    parser.add_argument("-w", "--workers", type=int, required=False, default=os.cpu_count(), help="Number of worker processes\n(default: number of cpus)")
+    parser.add_argument("-d", "--directory", type=str, required=False, help="Directory to store the encoded files in\n(default: temporary directory)")
+
+    args = parser.parse_args(args=sys.argv[1:] if argv is None else argv)
+
+    if args.workers <= 0:
+        print("Number of workers has to be a positive integer.")
+        return
+
+    directory = args.directory if args.directory is not None else tempfile.mkdtemp(None, "fpga_mediaplayer_jobs_")
+    os.makedirs(directory, exist_ok=True)
+
+    server = ThreadingHTTPServer((args.host, args.port), RequestHandler)
+    server.jobs = JobQueue(args.workers, directory)
+
+    print("Listening on http://" + args.host + ":" + str(args.port) + " with " + str(args.workers) + " workers.")
+    print("Encoded files are stored in " + directory)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.jobs.shutdown()
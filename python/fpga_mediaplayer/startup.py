@@ -0,0 +1,97 @@
+import argparse
+import sys
+import os
+import json
+import time
+import subprocess
+
+from typing import List
+
+# Scripts next to the package whose startup time is measured.
+TOOLS = ["convert", "tiles", "player", "concat", "flashdiff", "scan", "stats", "server", "client"]
+
+# Modules that must not be imported just to parse the arguments.
+HEAVY_MODULES = ["pyffmpeg", "PIL", "tkinter", "pyaudio"]
+
+
+# Runs every script with --help and returns the startup times in seconds
+# per script (minimum and median over all runs) and the heavy modules it imported.
+def measure_startup(tools: List[str] = TOOLS, runs: int = 10) -> dict:
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+
+    for tool in tools:
+        times = []
+
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(
+                [sys.executable, os.path.join(directory, tool + ".py"), "--help"],
+                cwd=directory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+            )
+            times.append(time.perf_counter() - started)
+
+        times.sort()
+
+        # Check in-process which heavy modules the entry point pulls in.
+        imported = subprocess.run(
+            [
+                sys.executable, "-c",
+                "import sys, fpga_mediaplayer." + tool + "; " +
+                "print(','.join([m for m in " + repr(HEAVY_MODULES) + " if m in sys.modules]))"
+            ],
+            cwd=directory, capture_output=True, text=True
+        ).stdout.strip()
+
+        results[tool] = {
+            "min": times[0],
+            "median": times[len(times) // 2],
+            "heavy_imports": imported.split(",") if imported else []
+        }
+
+    return results
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="startup",
+        description="Measures how long the scripts take to start by calling them with --help.\n" +
+                    "\n" +
+                    "Results can be stored and compared against a previous run\n" +
+                    "to track the startup time over time.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-n", "--runs", type=int, required=False, default=10, help="Number of runs per script\n(default: 10)")
+    parser.add_argument("-o", "--output", type=str, required=False, help="Write the results as json to this file")
+    parser.add_argument("-b", "--baseline", type=str, required=False, help="Compare against the results of a previous run")
+
+    args = parser.parse_args(args=sys.argv[1:] if argv is None else argv)
+
+    if args.runs <= 0:
+        print("Number of runs has to be a positive integer.")
+        return
+
+    baseline = {}
+    if args.baseline is not None:
+        with open(args.baseline, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = measure_startup(TOOLS, args.runs)
+
+    print("Script".ljust(12) + "Min".ljust(12) + "Median".ljust(12) + ("Baseline".ljust(12) if baseline else "") + "Heavy imports")
+
+    for tool, result in results.items():
+        line = tool.ljust(12) + (str(round(result["min"] * 1000)) + " ms").ljust(12) + (str(round(result["median"] * 1000)) + " ms").ljust(12)
+
+        if baseline:
+            if tool in baseline:
+                change = (result["median"] - baseline[tool]["median"]) / baseline[tool]["median"] * 100
+                line += (("+" if change >= 0 else "") + str(round(change, 1)) + "%").ljust(12)
+            else:
+                line += "-".ljust(12)
+
+        print(line + (", ".join(result["heavy_imports"]) if result["heavy_imports"] else "-"))
+
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=4)
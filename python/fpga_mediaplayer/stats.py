@@ -0,0 +1,148 @@
+import argparse
+import os
+import sys
+
+from typing import List, Tuple
+
+from .codec import MediaFile, DecoderStatistics, open_mediafile, CODEWORD_BITS, audio_decoder, video_decoder
+from .concat import parse_number
+
+CODEWORD_NAMES = ["same", "increment", "decrement", "full", "raw"]
+
+
+def print_text(name: str, statistics: DecoderStatistics, width: int, height: int):
+    second_bits = statistics.second_bits()
+    totals = [sum(counts) for counts in statistics.frame_codewords]
+    codewords = sum(totals)
+
+    print()
+    print(("=" * 20 + " " + name + " Statistics ").ljust(56, "="))
+
+    for i in range(len(CODEWORD_BITS)):
+        print((CODEWORD_NAMES[i].capitalize() + ": ").ljust(20) + str(totals[i]) + " (" + str(round(totals[i] / max(codewords, 1) * 100, 2)) + "%)")
+
+    print()
+    print("Bits per second: ".ljust(20) + "min " + str(min(second_bits, default=0)) + " / mean " + str(int(sum(second_bits) / max(len(second_bits), 1))) + " / max " + str(max(second_bits, default=0)))
+
+    if name == "Video":
+        frame_bits = statistics.frame_bits
+        frame_escapes = statistics.frame_codewords[3]
+
+        print("Bits per frame: ".ljust(20) + "min " + str(min(frame_bits, default=0)) + " / mean " + str(int(sum(frame_bits) / max(len(frame_bits), 1))) + " / max " + str(max(frame_bits, default=0)))
+        print("Full per frame: ".ljust(20) + "min " + str(min(frame_escapes, default=0)) + " / mean " + str(round(sum(frame_escapes) / max(len(frame_escapes), 1), 1)) + " / max " + str(max(frame_escapes, default=0)))
+
+        # Heatmap of the full sample code words per pixel, scaled to 0-9.
+        print()
+        print("Full code words per pixel (0-9, max " + str(max(statistics.escapes)) + "):")
+
+        peak = max(max(statistics.escapes), 1)
+        for y in range(height):
+            print("  " + "".join([str(statistics.escapes[y * width + x] * 9 // peak) for x in range(width)]))
+
+    print("========================================================")
+
+
+def print_csv(statistics: DecoderStatistics, width: int, table: str):
+    if table == "pixels":
+        print("x,y,full")
+
+        for i in range(len(statistics.escapes)):
+            print(str(i % width) + "," + str(i // width) + "," + str(statistics.escapes[i]))
+
+        return
+
+    if table == "seconds":
+        bits = statistics.second_bits()
+        codewords = statistics.second_codewords()
+    else:
+        bits = statistics.frame_bits
+        codewords = statistics.frame_codewords
+
+    print(table[:-1] + ",bits," + ",".join(CODEWORD_NAMES))
+
+    for i in range(len(bits)):
+        print(str(i) + "," + str(bits[i]) + "," + ",".join([str(counts[i]) for counts in codewords]))
+
+
+# Decodes the streams of a media file and returns their statistics as (name, statistics).
+# stream can be "audio" or "video" to only decode one of them.
+def collect_statistics(mediafile: MediaFile, stream: str = None) -> List[Tuple[str, DecoderStatistics]]:
+    width = mediafile.WIDTH if mediafile.WIDTH != 0 else 32
+    height = mediafile.HEIGHT if mediafile.HEIGHT != 0 else 24
+
+    streams = []
+
+    if mediafile.AUDIO_LENGTH > 0 and stream != "video":
+        # Audio has no frames so a frame covers a whole second.
+        audio_statistics = DecoderStatistics(44100, 1)
+        audio_decoder(mediafile.AUDIO, audio_statistics)
+
+        streams.append(("Audio", audio_statistics))
+
+    if mediafile.VIDEO_LENGTH > 0 and stream != "audio":
+        video_statistics = DecoderStatistics(width * height, 24)
+        video_decoder(width * height, mediafile.VIDEO, video_statistics, mediafile.VERSION, width)
+
+        streams.append(("Video", video_statistics))
+
+    return streams
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="stats",
+        description="Decodes a file that was encoded in the project's media format\n" +
+                    "and reports statistics about its code words.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-i", "--input", type=str, required=True, help="Input media file")
+    parser.add_argument("-s", "--stream", type=str, required=False, choices=["audio", "video"], help="Only report this stream\n(default: both)")
+    parser.add_argument("-f", "--format", type=str, required=False, default="text", choices=["text", "csv"], help="Output format\n(default: text)")
+    parser.add_argument("-t", "--table", type=str, required=False, default="frames", choices=["frames", "seconds", "pixels"], help="Table to output in csv format.\nAudio is reported per second for frames aswell.\n(default: frames)")
+    parser.add_argument("-p", "--position", type=str, required=False, default="0", help="Byte position of the media file inside the input (decimal or hex).\n(default: 0)")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(args=argv if argv else ["--help"])
+
+    if not os.path.exists(args.input):
+        print("Input file does not exist.")
+        return
+
+    try:
+        position = parse_number(args.position)
+    except:
+        print("Byte position is not a valid number.")
+        return
+
+    try:
+        mediafile = open_mediafile(args.input, position)
+    except Exception as e:
+        print("Input file could not be parsed.")
+        print("Error raised: " + str(e))
+        return
+
+    width = mediafile.WIDTH if mediafile.WIDTH != 0 else 32
+    height = mediafile.HEIGHT if mediafile.HEIGHT != 0 else 24
+
+    streams = collect_statistics(mediafile, args.stream)
+
+    if len(streams) == 0:
+        print("No stream to report.")
+        return
+
+    if args.format == "csv":
+        if len(streams) > 1:
+            print("Select the stream to output as csv with --stream.")
+            return
+
+        name, statistics = streams[0]
+
+        # Audio only has one frame per second and no pixels.
+        table = "seconds" if name == "Audio" else args.table
+        print_csv(statistics, width, table)
+    else:
+        print("Input: ".ljust(20) + args.input)
+        print("Resolution: ".ljust(20) + str(width) + ":" + str(height))
+
+        for name, statistics in streams:
+            print_text(name, statistics, width, height)
@@ -0,0 +1,256 @@
+import argparse
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from .codec import audio_encoder, video_encoder, intra_video_encoder
+from .convert import create_ffmpeg, preprocess, read_audio, read_video, write_mediafile
+
+
+def parse_grid(text: str, separator: str) -> Tuple[int, int]:
+    dimensions = text.split(separator)
+
+    if len(dimensions) != 2 or any([not x.isnumeric() or int(x) <= 0 for x in dimensions]):
+        raise ValueError()
+
+    return int(dimensions[0]), int(dimensions[1])
+
+
+# Cuts the frames of the whole wall into the frames of every board, row by row.
+# The tiles are returned as bytes since they have to be sent to the worker processes.
+def split_frames(videoframes: List[deque], columns: int, rows: int, width: int, height: int) -> List[List[bytes]]:
+    tiles = [[] for _ in range(columns * rows)]
+    wall_width = columns * width
+
+    for frame in videoframes:
+        frame = bytes(frame)
+
+        for row in range(rows):
+            for column in range(columns):
+                tiles[row * columns + column].append(b"".join([
+                    frame[y * wall_width + column * width:y * wall_width + (column + 1) * width]
+                    for y in range(row * height, (row + 1) * height)
+                ]))
+
+    return tiles
+
+
+def encode_tile(width: int, frames: List[bytes], intra: bool) -> bytes:
+    videoframes = [deque(frame) for frame in frames]
+
+    if intra:
+        return intra_video_encoder(width, videoframes)
+
+    return video_encoder(videoframes)
+
+
+# Converts a media file for a wall of columns x rows boards with the given resolution each.
+# The source is only processed once at the resolution of the whole wall and the tiles
+# are encoded in parallel. Only the master board gets the audio stream.
+# Writes one file per board and manifest.json into the output directory and returns the manifest.
+def convert_tiles(
+    input_file: str,
+    output_dir: str,
+    tiles: str = "2x2",
+    resolution: str = "32:24",
+    master: int = 0,
+    workers: int = None,
+    intra: bool = False,
+    verbose: bool = False
+) -> dict:
+    def log(text: str = "", end: str = "\n"):
+        if verbose:
+            print(text, end=end, flush=True)
+
+    if not os.path.exists(input_file):
+        raise Exception("Input file not found.")
+
+    try:
+        columns, rows = parse_grid(tiles, "x")
+    except ValueError:
+        raise Exception("Tile format is incorrect. Example: -t 3x2.")
+
+    try:
+        width, height = parse_grid(resolution, ":")
+    except ValueError:
+        raise Exception("Resolution format is incorrect. Example: -r 32:24.")
+
+    if width > 255 or height > 255:
+        raise Exception("The resolution of a board can be at most 255:255.")
+
+    if master < 0 or master >= columns * rows:
+        raise Exception("Master board has to be between 0 and " + str(columns * rows - 1) + ".")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    name = os.path.splitext(os.path.basename(input_file))[0]
+
+    log("=================== File Information ===================")
+
+    log("Input: ".ljust(20) + str(input_file))
+    log("Output: ".ljust(20) + str(output_dir))
+    log("Boards: ".ljust(20) + str(columns) + "x" + str(rows) + " at " + str(width) + ":" + str(height))
+    log("Wall resolution: ".ljust(20) + str(columns * width) + ":" + str(rows * height))
+    log("Master board: ".ljust(20) + str(master))
+
+    log("========================================================")
+
+
+    log()
+    log("================== FFmpeg Processing ===================")
+
+    log("Pre-processing input file...", end="")
+
+    temp_dir = tempfile.mkdtemp(None, "fpga_mediaplayer_tmp_")
+
+    try:
+        ff = create_ffmpeg()
+
+        try:
+            # Scale once to the whole wall, the tiles are cut out afterwards.
+            files = preprocess(ff, input_file, str(columns * width) + ":" + str(rows * height), temp_dir)
+        except Exception as error:
+            log("error!")
+            log()
+
+            raise Exception("The media file could not be processed by ffmpeg.\nError raised:\n" + str(error))
+        finally:
+            ff.quit()
+
+        log("done!")
+
+        audio_available = "audio.wav" in files
+        if audio_available:
+            files.remove("audio.wav")
+
+        video_available = len(files) > 0
+
+        if not video_available:
+            raise Exception("No video stream detected.")
+
+        log("========================================================")
+
+
+        log()
+        log("=================== Tile Processing ====================")
+
+        log("Reading video frames...", end="")
+        videoframes = read_video([os.path.join(temp_dir, file) for file in files])
+        framecount = len(videoframes)
+        log("done!")
+
+        log("Splitting frames...", end="")
+        tile_frames = split_frames(videoframes, columns, rows, width, height)
+        del videoframes
+        log("done!")
+
+        log("Encoding " + str(columns * rows) + " tiles" + (" and audio" if audio_available else "") + "...", end="")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Audio is encoded alongside the tiles since it doesn't depend on them.
+            if audio_available:
+                depth, channels, length, frames = read_audio(os.path.join(temp_dir, "audio.wav"))
+                audio_future = executor.submit(audio_encoder, channels, length, frames)
+
+            tile_futures = [executor.submit(encode_tile, width, frames, intra) for frames in tile_frames]
+            del tile_frames
+
+            encoded_audio_bytes = audio_future.result() if audio_available else bytes(0)
+            encoded_tiles = [future.result() for future in tile_futures]
+
+        log("done!")
+        log()
+
+        manifest = {
+            "input": input_file,
+            "columns": columns,
+            "rows": rows,
+            "width": width,
+            "height": height,
+            "frames": framecount,
+            "master": master,
+            "boards": []
+        }
+
+        log("Board".ljust(8) + "Position".ljust(12) + "Audio".ljust(10) + "Video".ljust(10) + "File")
+
+        for index in range(columns * rows):
+            column = index % columns
+            row = index // columns
+            file = name + "_" + str(column) + "_" + str(row) + ".bin"
+
+            audio_bytes = encoded_audio_bytes if index == master else bytes(0)
+
+            write_mediafile(
+                os.path.join(output_dir, file),
+                width,
+                height,
+                audio_bytes,
+                encoded_tiles[index],
+                2 if intra else 1
+            )
+
+            manifest["boards"].append({
+                "index": index,
+                "column": column,
+                "row": row,
+                "x": column * width,
+                "y": row * height,
+                "file": file,
+                "audio": index == master and audio_available,
+                "audio_size": len(audio_bytes),
+                "video_size": len(encoded_tiles[index])
+            })
+
+            log(
+                str(index).ljust(8) + (str(column) + "," + str(row)).ljust(12) +
+                (str(len(audio_bytes) // 1024) + " K").ljust(10) +
+                (str(len(encoded_tiles[index]) // 1024) + " K").ljust(10) + file
+            )
+
+        with open(os.path.join(output_dir, "manifest.json"), "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=4)
+
+        log("========================================================")
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return manifest
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="tiles",
+        description="Encodes a given media file for a wall of multiple LED boards.\n" +
+                    "\n" +
+                    "The file is scaled to the resolution of the whole wall once\n" +
+                    "and every frame is split into the tiles of the boards.\n" +
+                    "One file per board and a manifest.json are written\n" +
+                    "into the output directory.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("-i", "--input", type=str, required=True, help="Input media file")
+    parser.add_argument("-o", "--output", type=str, required=True, help="Output directory for the board files and the manifest")
+    parser.add_argument("-t", "--tiles", type=str, required=False, default="2x2", help="Number of boards in columns x rows.\n(default: 2x2)")
+    parser.add_argument("-r", "--resolution", type=str, required=False, default="32:24", help="Resolution of a single board in w:h.\n(default: 32:24)")
+    parser.add_argument("-m", "--master", type=int, required=False, default=0, help="Board that plays the audio, counted row by row from the top left.\n(default: 0)")
+    parser.add_argument("-w", "--workers", type=int, required=False, help="Number of worker processes encoding the tiles\n(default: number of cpus)")
+    parser.add_argument("-c", "--intra", action="store_true", required=False, help="Code scene cuts as intra frames without the previous frame.\nThe files can only be played by the python scripts.")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(args=argv if argv else ["--help"])
+
+    if args.workers is not None and args.workers <= 0:
+        print("Number of workers has to be a positive integer.")
+        return
+
+    try:
+        convert_tiles(args.input, args.output, args.tiles, args.resolution, args.master, args.workers, args.intra, verbose=True)
+    except Exception as e:
+        print(str(e))
@@ -0,0 +1,4 @@
+from fpga_mediaplayer.scan import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from fpga_mediaplayer.stats import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import shutil
+import threading
+import time
+
+from http.server import ThreadingHTTPServer
+
+from fpga_mediaplayer import convert, server
+from fpga_mediaplayer.client import Client
+
+
+# Stands in for pyffmpeg so the service can be tested without ffmpeg.
+class StubFFmpeg:
+    def quit(self):
+        pass
+
+
+# Copies the input (a WAVE file) as the audio stream, so the jobs only have audio.
+# Every job logs its input into started.log next to it and waits as long as
+# a file with the name of the input and .block appended exists.
+def stub_preprocess(ff, input_file: str, resolution: str, temp_dir: str):
+    with open(os.path.join(os.path.dirname(input_file), "started.log"), "a") as log:
+        log.write(os.path.basename(input_file) + "\n")
+
+    while os.path.exists(input_file + ".block"):
+        time.sleep(0.01)
+
+    shutil.copy(input_file, os.path.join(temp_dir, "audio.wav"))
+
+    return sorted(os.listdir(temp_dir))
+
+
+def stub_warm_up(temp_dir: str):
+    server.create_ffmpeg = StubFFmpeg
+    convert.preprocess = stub_preprocess
+
+    server.warm_up(temp_dir)
+
+
+# Client for a service with the stubbed ffmpeg and a single worker,
+# which is started on a free local port and stopped by close.
+class StubClient(Client):
+    def __init__(self, directory: str):
+        self.http_server = ThreadingHTTPServer(("127.0.0.1", 0), server.RequestHandler)
+        self.http_server.jobs = server.JobQueue(1, directory, stub_warm_up)
+
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+
+        super().__init__("http://127.0.0.1:" + str(self.http_server.server_address[1]))
+
+    def close(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        self.http_server.jobs.shutdown()
+
+    # Waits until the field of the job status (status, stage, ...) has the given value.
+    def wait_for(self, id: int, value: str, timeout: float = 10, field: str = "status") -> dict:
+        deadline = time.monotonic() + timeout
+        job = self.status(id)
+
+        while job[field] != value:
+            if time.monotonic() > deadline:
+                raise TimeoutError("Job " + str(id) + " has " + field + " " + str(job[field]) + " instead of " + value + ".")
+
+            time.sleep(0.01)
+            job = self.status(id)
+
+        return job
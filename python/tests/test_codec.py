@@ -0,0 +1,128 @@
+import random
+import unittest
+
+from collections import deque
+
+from fpga_mediaplayer.codec import (
+    FRAME_TEMPORAL, FRAME_INTRA, FRAME_SPATIAL, FRAME_MODE_BITS, StreamDecoder,
+    audio_encoder, audio_encoder_chunks, audio_decoder, video_encoder, video_encoder_chunks,
+    intra_video_encoder, intra_video_encoder_chunks, video_decoder
+)
+
+WIDTH = 8
+HEIGHT = 6
+
+
+# Slowly changing frames with a scene cut to noise and one to a smooth gradient,
+# so every frame mode of version 2 streams is used.
+def cut_frames() -> list:
+    generator = random.Random(4)
+    frame = [generator.randrange(256) for _ in range(WIDTH * HEIGHT)]
+    frames = []
+
+    for i in range(40):
+        if i == 12:
+            frame = [generator.randrange(256) for _ in range(WIDTH * HEIGHT)]
+        elif i == 25:
+            frame = [(x % WIDTH + x // WIDTH) * 16 for x in range(WIDTH * HEIGHT)]
+        else:
+            frame = [min(max(pixel + generator.choice([-16, 0, 0, 0, 16]), 0), 255) for pixel in frame]
+
+        frames.append(frame)
+
+    return frames
+
+
+def quantize(frames: list) -> list:
+    return [min(round(pixel / 16), 15) for frame in frames for pixel in frame]
+
+
+# Decodes the stream in chunks of the given size like the verification of convert.py does.
+def decode_in_chunks(decoder: StreamDecoder, data: bytes, size: int) -> list:
+    values = []
+
+    for i in range(0, len(data), size):
+        values += decoder.decode(data[i:i+size], i + size >= len(data))
+
+    return values
+
+
+class VideoCodecTest(unittest.TestCase):
+    def test_temporal_round_trip(self):
+        frames = cut_frames()
+        encoded = video_encoder([deque(frame) for frame in frames])
+
+        decoded = list(video_decoder(WIDTH * HEIGHT, encoded))
+        self.assertEqual(decoded[:len(frames) * WIDTH * HEIGHT], quantize(frames))
+
+        for size in [1, 3, 7, 64]:
+            decoder = StreamDecoder(WIDTH * HEIGHT, len(frames) * WIDTH * HEIGHT)
+            self.assertEqual(decode_in_chunks(decoder, encoded, size), quantize(frames))
+
+    def test_intra_round_trip(self):
+        frames = cut_frames()
+        frame_costs = []
+        encoded = intra_video_encoder(WIDTH, [deque(frame) for frame in frames], frame_costs)
+
+        # The cuts have to be coded without the previous frame.
+        modes = [min(range(3), key=lambda x: len(FRAME_MODE_BITS[x]) + costs[x]) for costs in frame_costs]
+        self.assertEqual(modes[0:12], [modes[0]] + [FRAME_TEMPORAL] * 11)
+        self.assertEqual(modes[12], FRAME_INTRA)
+        self.assertEqual(modes[25], FRAME_SPATIAL)
+
+        decoded = list(video_decoder(WIDTH * HEIGHT, encoded, None, 2, WIDTH))
+        self.assertEqual(decoded[:len(frames) * WIDTH * HEIGHT], quantize(frames))
+
+        for size in [1, 3, 7, 64]:
+            decoder = StreamDecoder(WIDTH * HEIGHT, len(frames) * WIDTH * HEIGHT, 2, WIDTH)
+            self.assertEqual(decode_in_chunks(decoder, encoded, size), quantize(frames))
+
+    # convert.py verifies the chunks while the next ones are encoded.
+    def test_chunks_match_stream(self):
+        frames = cut_frames()
+
+        for length in [1, 7, 24]:
+            chunks = list(video_encoder_chunks([deque(frame) for frame in frames], length))
+            self.assertEqual(len(chunks), -(-len(frames) // length))
+            self.assertEqual(b"".join(chunks), video_encoder([deque(frame) for frame in frames]))
+
+            chunks = list(intra_video_encoder_chunks(WIDTH, [deque(frame) for frame in frames], length))
+            self.assertEqual(b"".join(chunks), intra_video_encoder(WIDTH, [deque(frame) for frame in frames]))
+
+    def test_intra_needs_width(self):
+        with self.assertRaises(Exception):
+            video_decoder(WIDTH * HEIGHT, bytes(4), None, 2)
+
+        with self.assertRaises(Exception):
+            StreamDecoder(WIDTH * HEIGHT, WIDTH * HEIGHT, 2)
+
+
+class AudioCodecTest(unittest.TestCase):
+    def test_stereo_is_averaged(self):
+        generator = random.Random(7)
+        left = [generator.randrange(-30000, 30000) for _ in range(2000)]
+        right = [generator.randrange(-30000, 30000) for _ in range(2000)]
+
+        stereo = b"".join([
+            l.to_bytes(2, "little", signed=True) + r.to_bytes(2, "little", signed=True) for l, r in zip(left, right)
+        ])
+        mono = [round((l + r) / 2) for l, r in zip(left, right)]
+
+        encoded = audio_encoder(2, len(mono), stereo)
+
+        # Every sample has to be the average of its own channels.
+        self.assertEqual(encoded, audio_encoder(1, len(mono), b"".join([x.to_bytes(2, "little", signed=True) for x in mono])))
+
+        expected = [min(round(x / 4096), 7) for x in mono]
+        self.assertEqual(list(audio_decoder(encoded))[:len(mono)], expected)
+
+        for size in [1, 5, 64]:
+            values = decode_in_chunks(StreamDecoder(1, len(mono)), encoded, size)
+            self.assertEqual([(x ^ 8) - 8 for x in values], expected)
+
+        for length in [1, 300, 2000]:
+            self.assertEqual(b"".join(audio_encoder_chunks(2, len(mono), stereo, length)), encoded)
+
+
+if __name__ == "__main__":
+    unittest.main()
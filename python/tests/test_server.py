@@ -0,0 +1,145 @@
+import os
+import math
+import shutil
+import tempfile
+import unittest
+import wave
+
+from fpga_mediaplayer.codec import MediaFile, audio_encoder
+from fpga_mediaplayer.convert import read_audio
+
+from stubs import StubClient
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(None, "fpga_mediaplayer_test_")
+        self.client = StubClient(self.directory)
+
+    def tearDown(self):
+        self.client.close()
+        shutil.rmtree(self.directory)
+
+    # Writes a short mono WAVE file, blocked inputs wait in ffmpeg until they are released.
+    def input(self, name: str, blocked: bool = False) -> str:
+        path = os.path.join(self.directory, name + ".wav")
+
+        with wave.open(path, "w") as audiofile:
+            audiofile.setnchannels(1)
+            audiofile.setsampwidth(2)
+            audiofile.setframerate(44100)
+            audiofile.writeframes(b"".join([
+                int(20000 * math.sin(i / 20)).to_bytes(2, "little", signed=True) for i in range(4410)
+            ]))
+
+        if blocked:
+            open(path + ".block", "w").close()
+
+        return path
+
+    def release(self, path: str):
+        os.remove(path + ".block")
+
+    def started(self) -> list:
+        with open(os.path.join(self.directory, "started.log")) as log:
+            return log.read().split()
+
+    def test_priority_order(self):
+        blocker = self.input("blocker", True)
+        first = self.client.submit(blocker)
+        self.client.wait_for(first["id"], "running")
+
+        ids = [
+            self.client.submit(self.input("low"), priority=0)["id"],
+            self.client.submit(self.input("high"), priority=5)["id"],
+            self.client.submit(self.input("low_later"), priority=0)["id"],
+            self.client.submit(self.input("medium"), priority=1)["id"]
+        ]
+
+        self.release(blocker)
+
+        for id in ids:
+            self.assertEqual(self.client.wait(id, 0.01)["status"], "done")
+
+        self.assertEqual(self.started(), ["blocker.wav", "high.wav", "medium.wav", "low.wav", "low_later.wav"])
+
+    def test_cancel_queued_job(self):
+        blocker = self.input("blocker", True)
+        first = self.client.submit(blocker)
+        self.client.wait_for(first["id"], "running")
+
+        queued = self.client.submit(self.input("queued"))
+        self.assertEqual(self.client.cancel(queued["id"])["status"], "cancelled")
+
+        self.release(blocker)
+        self.assertEqual(self.client.wait(first["id"], 0.01)["status"], "done")
+
+        # The dispatcher skips the cancelled job.
+        self.assertEqual(self.client.wait(queued["id"], 0.01)["status"], "cancelled")
+        self.assertEqual(self.started(), ["blocker.wav"])
+
+        with self.assertRaises(Exception):
+            self.client.cancel(queued["id"])
+
+    def test_cancel_running_job(self):
+        blocker = self.input("blocker", True)
+        job = self.client.submit(blocker)
+        self.client.wait_for(job["id"], "running")
+
+        # Running jobs only stop after their current stage.
+        self.assertEqual(self.client.cancel(job["id"])["status"], "running")
+        self.release(blocker)
+
+        self.assertEqual(self.client.wait(job["id"], 0.01)["status"], "cancelled")
+        self.assertFalse(os.path.exists(os.path.join(self.directory, str(job["id"]) + ".bin")))
+
+        with self.assertRaises(Exception):
+            self.client.result(job["id"])
+
+    def test_progress(self):
+        blocker = self.input("blocker", True)
+        job = self.client.submit(blocker)
+        self.assertIn(job["status"], ["queued", "running"])
+
+        self.client.wait_for(job["id"], "running")
+
+        # The stage is only reported once the worker has started the job.
+        job = self.client.wait_for(job["id"], "ffmpeg", field="stage")
+        self.assertEqual(job["status"], "running")
+        self.assertEqual(job["progress"], 0.0)
+
+        self.release(blocker)
+
+        job = self.client.wait(job["id"], 0.01)
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["stage"], "done")
+        self.assertEqual(job["progress"], 1.0)
+        self.assertEqual(job["report"]["audio"]["samples"], 4410)
+        self.assertEqual([status["id"] for status in self.client.jobs()], [job["id"]])
+
+    def test_result(self):
+        path = self.input("clip")
+        job = self.client.submit(path, verify=True)
+        self.assertEqual(self.client.wait(job["id"], 0.01)["status"], "done")
+
+        mediafile = MediaFile(self.client.result(job["id"]))
+        depth, channels, length, frames = read_audio(path)
+
+        self.assertEqual(mediafile.VERSION, 1)
+        self.assertEqual(mediafile.VIDEO_LENGTH, 0)
+        self.assertEqual(bytes(mediafile.AUDIO), audio_encoder(channels, length, frames))
+
+        verify = self.client.status(job["id"])["report"]["audio"]["verify"]
+        self.assertIsNone(verify["first_mismatch"])
+        self.assertEqual(verify["decoded"], length)
+
+    def test_unknown_job(self):
+        with self.assertRaises(Exception):
+            self.client.status(42)
+
+        with self.assertRaises(Exception):
+            self.client.submit(os.path.join(self.directory, "missing.wav"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,4 @@
+from fpga_mediaplayer.tiles import main
+
+if __name__ == "__main__":
+    main()